@@ -11,6 +11,14 @@ from .merge_node import (
     NODE_CLASS_MAPPINGS as MERGE_CLASS_MAPPINGS,
     NODE_DISPLAY_NAME_MAPPINGS as MERGE_DISPLAY_MAPPINGS,
 )
+from .frame_source import (
+    NODE_CLASS_MAPPINGS as FRAME_SOURCE_CLASS_MAPPINGS,
+    NODE_DISPLAY_NAME_MAPPINGS as FRAME_SOURCE_DISPLAY_MAPPINGS,
+)
+from .plan_node import (
+    NODE_CLASS_MAPPINGS as PLAN_CLASS_MAPPINGS,
+    NODE_DISPLAY_NAME_MAPPINGS as PLAN_DISPLAY_MAPPINGS,
+)
 from .mode_select_node import (
     NODE_CLASS_MAPPINGS as MODE_SELECT_CLASS_MAPPINGS,
     NODE_DISPLAY_NAME_MAPPINGS as MODE_SELECT_DISPLAY_MAPPINGS,
@@ -24,6 +32,10 @@ NODE_DISPLAY_NAME_MAPPINGS.update(LATENT_DISPLAY_MAPPINGS)
 NODE_DISPLAY_NAME_MAPPINGS.update(MERGE_DISPLAY_MAPPINGS)
 NODE_CLASS_MAPPINGS.update(MODE_SELECT_CLASS_MAPPINGS)
 NODE_DISPLAY_NAME_MAPPINGS.update(MODE_SELECT_DISPLAY_MAPPINGS)
+NODE_CLASS_MAPPINGS.update(FRAME_SOURCE_CLASS_MAPPINGS)
+NODE_DISPLAY_NAME_MAPPINGS.update(FRAME_SOURCE_DISPLAY_MAPPINGS)
+NODE_CLASS_MAPPINGS.update(PLAN_CLASS_MAPPINGS)
+NODE_DISPLAY_NAME_MAPPINGS.update(PLAN_DISPLAY_MAPPINGS)
 
 WEB_DIRECTORY = "./web/js"
 
@@ -0,0 +1,77 @@
+"""CPU benchmark of VACE Merge Back's optical-flow backends.
+
+cv2 warps each seam frame with cv2.remap on 8-bit frames; torch estimates the flow of every
+frame pair first, then warps the whole zone with one grid_sample call. Both use the same
+Farneback flow, so the report splits each backend into flow estimation and warp, and shows
+how far the two results are apart.
+
+    python benchmarks/bench_of_backend.py --frames 16 --size 1280x720 --preset balanced --threads 1
+
+Runs from a checkout without ComfyUI; needs torch, numpy and opencv-python.
+"""
+import argparse
+import importlib
+import pathlib
+import sys
+import time
+import types
+
+import torch
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if "vace_tools" not in sys.modules:
+    package = types.ModuleType("vace_tools")
+    package.__path__ = [str(ROOT)]
+    sys.modules["vace_tools"] = package
+merge_node = importlib.import_module("vace_tools.merge_node")
+
+
+def seam_frames(frames, height, width, shift=(3, 2), seed=0):
+    """A smooth random texture (frames_a) and the same texture moved by shift pixels (frames_b)."""
+    g = torch.Generator().manual_seed(seed)
+    coarse = torch.rand(frames, 3, height // 16 + 1, width // 16 + 1, generator=g)
+    a = torch.nn.functional.interpolate(coarse, size=(height, width), mode="bicubic", align_corners=False)
+    a = a.clamp(0, 1).permute(0, 2, 3, 1).contiguous()
+    return a, torch.roll(a, shifts=shift, dims=(1, 2))
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=16, help="seam frames in the blend zone")
+    parser.add_argument("--size", default="1280x720", help="frame size WxH")
+    parser.add_argument("--preset", default="balanced", choices=sorted(merge_node.OPTICAL_FLOW_PRESETS))
+    parser.add_argument("--threads", type=int, default=1, help="torch threads (cv2 backend: seam worker threads)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    torch.set_num_threads(args.threads)
+    frames_a, frames_b = seam_frames(args.frames, height, width)
+    alphas = [(j + 1) / (args.frames + 1) for j in range(args.frames)]
+
+    def blend(backend):
+        out = torch.empty_like(frames_a)
+        merge_node._blend_zones([(out, frames_a, frames_b, alphas)], "optical_flow", args.preset, backend, args.threads)
+        return out
+
+    flow_time, _ = timed(lambda: merge_node._farneback_flows(frames_a, frames_b, args.preset, args.threads), args.repeat)
+    results = {}
+    print(f"{args.frames} seam frames at {width}x{height}, preset '{args.preset}', {args.threads} thread(s)")
+    for backend in ("cv2", "torch"):
+        total, results[backend] = timed(lambda: blend(backend), args.repeat)
+        print(f"  {backend:5s} {total:7.3f} s  (flow {flow_time:.3f} s + warp {max(0.0, total - flow_time):.3f} s)")
+    diff = (results["cv2"] - results["torch"]).abs()
+    print(f"  max |cv2 - torch| {diff.max():.4f}, mean {diff.mean():.4f}")
+
+
+if __name__ == "__main__":
+    main()
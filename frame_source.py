@@ -0,0 +1,135 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+import torch
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+
+
+def _natural_key(name):
+    """Sort key ordering frame_2.png before frame_10.png."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+class FrameSource:
+    """Read-only (B, H, W, C) frame sequence on disk, loaded frame range by frame range.
+
+    Backed by an .npy array (memory-mapped; e.g. from VACE Merge Back (To Disk)) or a directory of
+    images in natural filename order. Indexing reads only the selected frames and returns a
+    regular tensor, so nodes can slice it exactly like an IMAGE batch.
+    """
+
+    def __init__(self, path, frame_count=0):
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            files = sorted((f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS)), key=_natural_key)
+            if not files:
+                raise ValueError(f"Frame source: no images in '{path}'.")
+            self._files = [os.path.join(path, f) for f in files]
+            self._array = None
+            first = self._load_image(self._files[0])
+            count, frame_shape, self.dtype = len(files), tuple(first.shape), torch.float32
+        elif path.endswith(".npy") and os.path.isfile(path):
+            self._files = None
+            self._array = np.load(path, mmap_mode="r")
+            if self._array.ndim != 4:
+                raise ValueError(f"Frame source: '{path}' holds a {self._array.ndim}-D array, expected (B, H, W, C).")
+            count, frame_shape = self._array.shape[0], tuple(self._array.shape[1:])
+            self.dtype = torch.from_numpy(np.empty(0, dtype=self._array.dtype)).dtype
+        else:
+            raise ValueError(f"Frame source: '{path}' is neither an image directory nor an .npy file.")
+        if frame_count > 0:
+            count = min(count, frame_count)
+        self.path = path
+        self.shape = torch.Size((count,) + frame_shape)
+        self.device = torch.device("cpu")
+
+    def __len__(self):
+        return self.shape[0]
+
+    @staticmethod
+    def _load_image(path):
+        from PIL import Image, ImageOps
+
+        image = ImageOps.exif_transpose(Image.open(path)).convert("RGB")
+        return torch.from_numpy(np.array(image).astype(np.float32) / 255.0)
+
+    def __getitem__(self, index):
+        rest = ()
+        if isinstance(index, tuple):
+            index, rest = index[0], index[1:]
+        if isinstance(index, int):
+            i = range(len(self))[index]
+            return self[(slice(i, i + 1),) + rest][0]
+        frames = range(len(self))[index]
+        if self._array is not None:
+            if frames.step == 1:
+                data = self._array[(slice(frames.start, frames.stop),) + rest]
+            else:
+                data = self._array[(list(frames),) + rest]
+            return torch.from_numpy(np.array(data))
+        if len(frames) == 0:
+            return torch.empty((0,) + tuple(self.shape[1:]), dtype=self.dtype)[(slice(None),) + rest]
+        return torch.stack([self._load_image(self._files[i]) for i in frames])[(slice(None),) + rest]
+
+    def load(self):
+        """Every frame as one (B, H, W, C) tensor."""
+        return self[:]
+
+
+class VACEFrameSource:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "open"
+    RETURN_TYPES = ("VACE_FRAMES", "INT")
+    RETURN_NAMES = ("source_frames", "frame_count")
+    OUTPUT_TOOLTIPS = (
+        "Lazy frame source — wire to VACE Source Prep / VACE Merge Back (To Disk) instead of source_clip.",
+        "Number of frames in the source.",
+    )
+    DESCRIPTION = """VACE Frame Source — opens a long source on disk without loading it.
+
+path is either a directory of images (sorted by natural filename order) or an .npy array of
+(frames, H, W, C) floats, such as the output of VACE Merge Back (To Disk). Only the frame size is
+read here; nodes taking source_frames load just the frames they select."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "path": ("STRING", {"default": "/path/to/frames", "description": "Image-sequence directory or .npy frame array."}),
+            },
+            "optional": {
+                "frame_count": ("INT", {"default": 0, "min": 0, "max": 1000000, "description": "Use only the first N frames (0 = all)."}),
+            },
+        }
+
+    @classmethod
+    def IS_CHANGED(cls, path, frame_count=0):
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            # A directory's own mtime misses frames overwritten in place, so fingerprint every image
+            digest = hashlib.blake2b(digest_size=16)
+            for name in sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS)):
+                stat = os.stat(os.path.join(path, name))
+                digest.update(repr((name, stat.st_mtime_ns, stat.st_size)).encode())
+            return digest.hexdigest()
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        return float("nan")
+
+    def open(self, path, frame_count=0):
+        source = FrameSource(path, frame_count)
+        return (source, len(source))
+
+
+NODE_CLASS_MAPPINGS = {
+    "VACEFrameSource": VACEFrameSource,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "VACEFrameSource": "VACE Frame Source",
+}
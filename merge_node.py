@@ -1,16 +1,37 @@
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import torch
+import torch.nn.functional as F
 import numpy as np
 
+from .nodes import LATENT_SPATIAL, LATENT_TEMPORAL, OUTPUT_DTYPES, _snap_4n1
+
 
 OPTICAL_FLOW_PRESETS = {
     'fast':     {'levels': 2, 'winsize': 11, 'iterations': 2, 'poly_n': 5, 'poly_sigma': 1.1},
     'balanced': {'levels': 3, 'winsize': 15, 'iterations': 3, 'poly_n': 5, 'poly_sigma': 1.2},
     'quality':  {'levels': 5, 'winsize': 21, 'iterations': 5, 'poly_n': 7, 'poly_sigma': 1.5},
     'max':      {'levels': 7, 'winsize': 31, 'iterations': 10, 'poly_n': 7, 'poly_sigma': 1.5},
+    # Proxy presets: flow estimated on downscaled grayscale, upsampled for the full-resolution warp
+    'balanced_half':    {'levels': 3, 'winsize': 15, 'iterations': 3, 'poly_n': 5, 'poly_sigma': 1.2, 'flow_scale': 0.5},
+    'quality_half':     {'levels': 5, 'winsize': 21, 'iterations': 5, 'poly_n': 7, 'poly_sigma': 1.5, 'flow_scale': 0.5},
+    'quality_quarter':  {'levels': 4, 'winsize': 21, 'iterations': 5, 'poly_n': 7, 'poly_sigma': 1.5, 'flow_scale': 0.25},
 }
 
+OF_BACKEND_DESCRIPTION = (
+    "cv2: per-frame cv2.remap on 8-bit frames. "
+    "torch: flow for all seam frames first, then one batched grid_sample warp in the frame dtype (no 8-bit quantization)."
+)
+
 PASS_THROUGH_MODES = {"Edge Extend", "Frame Interpolation", "Keyframe", "Video Inpaint", "Upscale"}
 
+OF_CACHE_MODES = ["off", "memory", "memory+disk"]
+
 
 
 def _alpha_blend(frame_a, frame_b, alpha):
@@ -18,20 +39,18 @@ def _alpha_blend(frame_a, frame_b, alpha):
     return frame_a * (1.0 - alpha) + frame_b * alpha
 
 
-def _optical_flow_blend(frame_a, frame_b, alpha, preset):
-    """Motion-compensated blend using Farneback optical flow."""
-    try:
-        import cv2
-    except ImportError:
-        return _alpha_blend(frame_a, frame_b, alpha)
-
-    params = OPTICAL_FLOW_PRESETS[preset]
-
-    arr_a = (frame_a.cpu().numpy() * 255).clip(0, 255).astype(np.uint8)
-    arr_b = (frame_b.cpu().numpy() * 255).clip(0, 255).astype(np.uint8)
+def _farneback(cv2, gray_a, gray_b, params):
+    """Farneback flow a→b (H, W, 2) in full-resolution pixels.
 
-    gray_a = cv2.cvtColor(arr_a, cv2.COLOR_RGB2GRAY)
-    gray_b = cv2.cvtColor(arr_b, cv2.COLOR_RGB2GRAY)
+    With params['flow_scale'] < 1 the flow is estimated on downscaled frames, then resized back
+    and its vectors rescaled to full-resolution pixel units.
+    """
+    h, w = gray_a.shape
+    scale = params.get('flow_scale', 1.0)
+    if scale < 1.0:
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        gray_a = cv2.resize(gray_a, size, interpolation=cv2.INTER_AREA)
+        gray_b = cv2.resize(gray_b, size, interpolation=cv2.INTER_AREA)
     flow = cv2.calcOpticalFlowFarneback(
         gray_a, gray_b, None,
         pyr_scale=0.5,
@@ -42,6 +61,181 @@ def _optical_flow_blend(frame_a, frame_b, alpha, preset):
         poly_sigma=params['poly_sigma'],
         flags=0,
     )
+    if scale < 1.0:
+        flow = cv2.resize(flow, (w, h), interpolation=cv2.INTER_LINEAR)
+        flow[..., 0] *= w / size[0]
+        flow[..., 1] *= h / size[1]
+    return flow
+
+
+class _FlowCache:
+    """Byte-budgeted LRU of Farneback flow fields, keyed on a hash of both grayscale frames and the preset.
+
+    Flows are kept as fp16 (H, W, 2) arrays in memory and, in memory+disk mode, also as .npy
+    files in a cache directory that are memory-mapped back on a hit. Each level evicts its least
+    recently used entries once over budget; disk recency is the file mtime, so it survives
+    restarts. Shared by the seam threads, hence the lock.
+    """
+
+    def __init__(self, memory_budget, disk_budget):
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._flows = OrderedDict()
+        self._bytes = 0
+        self._files = None
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(gray_a, gray_b, params):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((gray_a.shape, sorted(params.items()))).encode())
+        digest.update(np.ascontiguousarray(gray_a).data)
+        digest.update(np.ascontiguousarray(gray_b).data)
+        return digest.hexdigest()
+
+    def _remember(self, key, flow):
+        """Insert into the memory level (lock held)."""
+        if flow.nbytes > self.memory_budget:
+            return
+        old = self._flows.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._flows[key] = flow
+        self._bytes += flow.nbytes
+        while self._bytes > self.memory_budget:
+            _, evicted = self._flows.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def _index(self):
+        """{path: size} of the cache directory, oldest first — scanned once (lock held)."""
+        if self._files is None:
+            directory = _flow_cache_dir()
+            os.makedirs(directory, exist_ok=True)
+            entries = []
+            for name in os.listdir(directory):
+                if name.endswith(".npy"):
+                    st = os.stat(os.path.join(directory, name))
+                    entries.append((st.st_mtime, os.path.join(directory, name), st.st_size))
+            self._files = OrderedDict((path, size) for _, path, size in sorted(entries))
+            self._disk_bytes = sum(self._files.values())
+        return self._files
+
+    def get(self, key, disk=False):
+        with self._lock:
+            flow = self._flows.get(key)
+            if flow is not None:
+                self._flows.move_to_end(key)
+                self.hits += 1
+                return flow
+            if disk:
+                files = self._index()
+                path = os.path.join(_flow_cache_dir(), key + ".npy")
+                if path in files:
+                    try:
+                        flow = np.load(path, mmap_mode="r")
+                        os.utime(path)
+                    except (OSError, ValueError):
+                        self._disk_bytes -= files.pop(path)
+                    else:
+                        files.move_to_end(path)
+                        self._remember(key, flow)
+                        self.disk_hits += 1
+                        return flow
+            self.misses += 1
+            return None
+
+    def put(self, key, flow, disk=False):
+        """Store flow as fp16 and return the stored array, so hits and misses see identical values."""
+        flow = flow.astype(np.float16)
+        with self._lock:
+            self._remember(key, flow)
+            if disk and flow.nbytes <= self.disk_budget:
+                files = self._index()
+                path = os.path.join(_flow_cache_dir(), key + ".npy")
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, flow)
+                os.replace(tmp, path)
+                self._disk_bytes -= files.pop(path, 0)
+                files[path] = os.path.getsize(path)
+                self._disk_bytes += files[path]
+                while self._disk_bytes > self.disk_budget:
+                    evicted, size = files.popitem(last=False)
+                    self._disk_bytes -= size
+                    try:
+                        os.remove(evicted)
+                    except OSError:
+                        pass
+        return flow
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._flows),
+            "bytes": self._bytes,
+            "budget_bytes": self.memory_budget,
+            "disk_entries": len(self._files or ()),
+            "disk_bytes": self._disk_bytes,
+            "disk_budget_bytes": self.disk_budget,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._flows.clear()
+            self._bytes = 0
+
+
+_FLOW_CACHE = _FlowCache(memory_budget=1024 ** 3, disk_budget=8 * 1024 ** 3)
+
+
+def _flow_cache_dir():
+    """On-disk flow cache location: $VACE_FLOW_CACHE_DIR, else vace_flow_cache in ComfyUI's user directory."""
+    directory = os.environ.get("VACE_FLOW_CACHE_DIR")
+    if directory:
+        return directory
+    import folder_paths
+    return os.path.join(folder_paths.get_user_directory(), "vace_flow_cache")
+
+
+def flow_cache_stats():
+    """Hit/miss counters and memory/disk usage of the optical flow cache."""
+    return _FLOW_CACHE.stats()
+
+
+def _cached_farneback(cv2, gray_a, gray_b, params, cache="off"):
+    """_farneback through the flow cache ("memory", "memory+disk" or "off"), as float32."""
+    if cache == "off":
+        return _farneback(cv2, gray_a, gray_b, params)
+    disk = cache == "memory+disk"
+    key = _FlowCache.key(gray_a, gray_b, params)
+    flow = _FLOW_CACHE.get(key, disk)
+    if flow is None:
+        flow = _FLOW_CACHE.put(key, _farneback(cv2, gray_a, gray_b, params), disk)
+    return flow.astype(np.float32)
+
+
+def _optical_flow_blend(frame_a, frame_b, alpha, preset, cache="off"):
+    """Motion-compensated blend using Farneback optical flow."""
+    try:
+        import cv2
+    except ImportError:
+        return _alpha_blend(frame_a, frame_b, alpha)
+
+    params = OPTICAL_FLOW_PRESETS[preset]
+
+    # Quantize in torch so fp16/bf16 frames never pass through a float32 numpy copy
+    arr_a = (frame_a * 255).clamp(0, 255).to(torch.uint8).cpu().numpy()
+    arr_b = (frame_b * 255).clamp(0, 255).to(torch.uint8).cpu().numpy()
+
+    gray_a = cv2.cvtColor(arr_a, cv2.COLOR_RGB2GRAY)
+    gray_b = cv2.cvtColor(arr_b, cv2.COLOR_RGB2GRAY)
+    flow = _cached_farneback(cv2, gray_a, gray_b, params, cache)
 
     h, w = flow.shape[:2]
     x_coords = np.tile(np.arange(w), (h, 1)).astype(np.float32)
@@ -68,7 +262,310 @@ def _optical_flow_blend(frame_a, frame_b, alpha, preset):
     )
 
     result = cv2.addWeighted(warped_a, 1 - alpha, warped_b, alpha, 0)
-    return torch.from_numpy(result.astype(np.float32) / 255.0).to(frame_a.device)
+    return torch.from_numpy(result).to(device=frame_a.device, dtype=frame_a.dtype) / 255.0
+
+
+@functools.lru_cache(maxsize=8)
+def _base_grid(height, width, device):
+    """Identity sampling grid (H, W, 2) in grid_sample's normalized [-1, 1] coords.
+
+    Kept for the last few size/device pairs only; callers must not modify it in place.
+    """
+    ys = torch.linspace(-1.0, 1.0, height, device=device)
+    xs = torch.linspace(-1.0, 1.0, width, device=device)
+    gy, gx = torch.meshgrid(ys, xs, indexing="ij")
+    return torch.stack([gx, gy], dim=-1)
+
+
+def _resolve_workers(workers):
+    """Thread count for seam work: workers > 0 as given, 0 = one per CPU."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _ordered_map(fn, count, workers):
+    """[fn(0), ..., fn(count - 1)] — on a thread pool when workers > 1, always in index order.
+
+    cv2's Farneback and remap release the GIL, so seam frames run truly in parallel.
+    """
+    if workers <= 1 or count <= 1:
+        return [fn(j) for j in range(count)]
+    with ThreadPoolExecutor(max_workers=min(workers, count)) as pool:
+        return list(pool.map(fn, range(count)))
+
+
+def _farneback_flows(frames_a, frames_b, preset, workers=1, cache="off"):
+    """Dense Farneback flow a→b for every frame pair, as an (N, H, W, 2) float32 tensor in pixels."""
+    import cv2
+
+    params = OPTICAL_FLOW_PRESETS[preset]
+    arr_a = (frames_a * 255).clamp(0, 255).to(torch.uint8).cpu().numpy()
+    arr_b = (frames_b * 255).clamp(0, 255).to(torch.uint8).cpu().numpy()
+
+    def flow(j):
+        gray_a = cv2.cvtColor(arr_a[j], cv2.COLOR_RGB2GRAY)
+        gray_b = cv2.cvtColor(arr_b[j], cv2.COLOR_RGB2GRAY)
+        return _cached_farneback(cv2, gray_a, gray_b, params, cache)
+
+    flows = _ordered_map(flow, arr_a.shape[0], workers)
+    return torch.from_numpy(np.stack(flows)).to(frames_a.device)
+
+
+def _optical_flow_blend_batch(frames_a, frames_b, alphas, preset, workers=1, cache="off"):
+    """Batched motion-compensated blend: warp both stacks with grid_sample and crossfade.
+
+    Same warp as _optical_flow_blend (A forward by alpha * flow, B backward by (1 - alpha) * flow,
+    border replicate), but without 8-bit quantization of the frames. Half-precision frames are
+    sampled in float32 because fp16/bf16 normalized coordinates are too coarse at video
+    resolutions; the result is returned in the frame dtype.
+    """
+    try:
+        flows = _farneback_flows(frames_a, frames_b, preset, workers, cache)
+    except ImportError:
+        weights = torch.tensor(alphas, dtype=frames_a.dtype, device=frames_a.device).view(-1, 1, 1, 1)
+        return torch.lerp(frames_a, frames_b.to(frames_a.dtype), weights)
+
+    N, H, W, _ = frames_a.shape
+    dtype = frames_a.dtype
+    compute = dtype if dtype in (torch.float32, torch.float64) else torch.float32
+    alpha = torch.tensor(alphas, dtype=torch.float32, device=flows.device).view(-1, 1, 1, 1)
+    # pixels → normalized offsets (align_corners=True: -1 and 1 are the outer pixel centres)
+    scale = torch.tensor([2.0 / max(W - 1, 1), 2.0 / max(H - 1, 1)], device=flows.device)
+    base = _base_grid(H, W, flows.device)
+    grid_a = (base + flows * alpha * scale).to(compute)
+    grid_b = (base - flows * (1.0 - alpha) * scale).to(compute)
+    del flows
+
+    def warp(frames, grid):
+        src = frames.to(compute).permute(0, 3, 1, 2)
+        return F.grid_sample(src, grid, mode="bilinear", padding_mode="border", align_corners=True).permute(0, 2, 3, 1)
+
+    warped_a = warp(frames_a, grid_a)
+    warped_a.lerp_(warp(frames_b, grid_b), alpha.to(compute))
+    return warped_a.to(dtype)
+
+
+def _tile_starts(size, tile, overlap):
+    """Start offsets of tiles of length `tile` covering [0, size), overlapping by at least `overlap`."""
+    if size <= tile:
+        return [0]
+    return list(range(0, size - tile, tile - overlap)) + [size - tile]
+
+
+def _tiled(fn, frames_a, frames_b, tile):
+    """Apply blend fn(a, b) over overlapping spatial tiles of (..., H, W, C) frames.
+
+    Each tile is computed on a crop widened by a tile // 4 context margin, so flow near its
+    edges still sees the surrounding motion, then trimmed back. Neighbouring tiles overlap by
+    tile // 8 px and are cross-faded there. Peak extra memory follows the tile size, not the
+    frame size.
+    """
+    H, W = frames_a.shape[-3], frames_a.shape[-2]
+    margin, overlap = tile // 4, tile // 8
+    result = torch.zeros_like(frames_a)
+
+    def ramp(n, soft):
+        w = torch.ones(n, dtype=torch.float32, device=frames_a.device)
+        if soft and overlap > 0:
+            w = ((torch.arange(n, dtype=torch.float32, device=frames_a.device) + 1) / (overlap + 1)).clamp(max=1.0)
+        return w
+
+    for y0 in _tile_starts(H, tile, overlap):
+        for x0 in _tile_starts(W, tile, overlap):
+            y1, x1 = min(y0 + tile, H), min(x0 + tile, W)
+            py0, px0 = max(0, y0 - margin), max(0, x0 - margin)
+            py1, px1 = min(H, y1 + margin), min(W, x1 + margin)
+            out = fn(frames_a[..., py0:py1, px0:px1, :], frames_b[..., py0:py1, px0:px1, :])
+            out = out[..., y0 - py0:y1 - py0, x0 - px0:x1 - px0, :]
+            # tiles above and to the left are already written — fade in over the overlap
+            w = torch.minimum(ramp(y1 - y0, y0 > 0)[:, None], ramp(x1 - x0, x0 > 0)[None, :]).unsqueeze(-1)
+            result[..., y0:y1, x0:x1, :].lerp_(out.to(result.dtype), w.to(result.dtype))
+    return result
+
+
+def _blend_zones(zones, blend_method, of_preset, of_backend="cv2", workers=1, tile=0, cache="off"):
+    """Blend each (out, frames_a, frames_b, alphas) zone frames_a → frames_b, writing into out (N,H,W,C).
+
+    For cv2 optical flow, the frames of all zones share one thread pool, so both seams of a
+    splice (or every window overlap) run concurrently. tile > 0 runs optical flow tile by tile
+    (see _tiled); cache selects the flow cache level (see _FlowCache).
+    """
+    if blend_method == "optical_flow" and of_backend == "cv2":
+        tasks = [(out, frames_a, frames_b, alphas, j) for out, frames_a, frames_b, alphas in zones for j in range(len(alphas))]
+
+        def blend(k):
+            out, frames_a, frames_b, alphas, j = tasks[k]
+
+            def flow_blend(a, b):
+                return _optical_flow_blend(a, b, alphas[j], of_preset, cache)
+
+            a, b = frames_a[j].to(out.dtype), frames_b[j].to(out.dtype)
+            return _tiled(flow_blend, a, b, tile) if tile > 0 else flow_blend(a, b)
+
+        for (out, _, _, _, j), frame in zip(tasks, _ordered_map(blend, len(tasks), workers)):
+            out[j] = frame
+        return
+    for out, frames_a, frames_b, alphas in zones:
+        if blend_method == "optical_flow":
+            def flow_blend(a, b):
+                return _optical_flow_blend_batch(a, b, alphas, of_preset, workers, cache)
+
+            a, b = frames_a.to(out.dtype), frames_b.to(out.dtype)
+            out.copy_(_tiled(flow_blend, a, b, tile) if tile > 0 else flow_blend(a, b))
+        else:
+            # (N,1,1,1) ramps broadcast over the zone, written in place. Same arithmetic as
+            # _alpha_blend (a * (1 - alpha) + b * alpha), so results match it bit for bit;
+            # addcmul_ would fuse the second product and round differently. Its product is
+            # therefore formed one frame at a time, keeping the temporary to a single frame.
+            weights_a = torch.tensor([1.0 - a for a in alphas], dtype=out.dtype, device=out.device).view(-1, 1, 1, 1)
+            weights_b = torch.tensor(alphas, dtype=out.dtype, device=out.device).view(-1, 1, 1)
+            torch.mul(frames_a.to(out.dtype), weights_a, out=out)
+            for j in range(out.shape[0]):
+                out[j].add_(frames_b[j].to(out.dtype) * weights_b[j])
+
+
+def _feather_weights(crop, frame_h, frame_w, feather, dtype, device):
+    """(h, w, 1) paste weights for a crop: 1 inside, ramping down over `feather` px towards
+    crop edges that lie inside the frame. Edges on the frame border stay hard."""
+    top, left, bottom, right = crop
+
+    def ramp(n, soft_lo, soft_hi):
+        d = torch.arange(n, dtype=torch.float32, device=device)
+        w = torch.ones(n, dtype=torch.float32, device=device)
+        if soft_lo:
+            w = torch.minimum(w, (d + 1) / (feather + 1))
+        if soft_hi:
+            w = torch.minimum(w, (n - d) / (feather + 1))
+        return w
+
+    wy = ramp(bottom - top, top > 0, bottom < frame_h)
+    wx = ramp(right - left, left > 0, right < frame_w)
+    return torch.minimum(wy[:, None], wx[None, :]).unsqueeze(-1).to(dtype)
+
+
+def _paste_crop(source_clip, vace_output, crop, feather, out):
+    """Write source_clip into out with a cropped VACE result pasted back over it.
+
+    Works on any frame range: vace_output may be shorter than source_clip, the rest stays source.
+    """
+    top, left, bottom, right = crop
+    if vace_output.shape[1] != bottom - top or vace_output.shape[2] != right - left:
+        raise ValueError(
+            f"Crop merge: vace_output is {vace_output.shape[1]}x{vace_output.shape[2]} but the crop recorded "
+            f"in vace_pipe is {bottom - top}x{right - left}."
+        )
+    n = min(vace_output.shape[0], source_clip.shape[0])
+    out.copy_(source_clip)
+    region = out[:n, top:bottom, left:right]
+    patch = vace_output[:n].to(out.dtype)
+    if feather > 0:
+        region.lerp_(patch, _feather_weights(crop, source_clip.shape[1], source_clip.shape[2], feather, out.dtype, out.device))
+    else:
+        region.copy_(patch)
+
+
+def _is_pass_through(vace_pipe):
+    """True when vace_output already is the whole merged result."""
+    return vace_pipe.get("crop") is None and "window_index" not in vace_pipe and vace_pipe["mode"] in PASS_THROUGH_MODES
+
+
+def _frames_piece(label, frames, start=0, end=None):
+    """Merge piece copying frames[start:end] verbatim (see _merge_pieces).
+
+    Slicing is deferred to write time, so a FrameSource is only read chunk by chunk.
+    """
+    end = frames.shape[0] if end is None else min(end, frames.shape[0])
+    return max(0, end - start), lambda lo, hi, out: out.copy_(frames[start + lo:start + hi]), label
+
+
+def _merge_pieces(source_clip, vace_output, vace_pipe, blend_method, of_preset, source_clip_2, dtype, crop_feather,
+                  of_backend, workers, of_tile, of_cache):
+    """Plan VACE Merge Back's output as consecutive pieces [(count, write, label)].
+
+    write(lo, hi, out) fills out with frames lo..hi of its piece, so a sink can materialize the
+    result in one tensor or chunk by chunk. label names where the frames come from ("source",
+    "vace", "blend", "tail" or "crop"). Untouched source / VACE ranges are plain copies; seam
+    zones are blended up front into small buffers.
+    """
+    # Cropped Video Inpaint: paste the generated region back into the full frames
+    crop = vace_pipe.get("crop")
+    if crop is not None:
+        return [(source_clip.shape[0],
+                 lambda lo, hi, out: _paste_crop(source_clip[lo:hi], vace_output[lo:hi], crop, crop_feather, out), "crop")]
+
+    # Pass-through modes: VACE output IS the final result — unless it is one window of a longer source
+    if _is_pass_through(vace_pipe):
+        return [_frames_piece("vace", vace_output)]
+
+    trim_start = vace_pipe["trim_start"]
+    trim_end = vace_pipe["trim_end"]
+    left_ctx = vace_pipe["left_ctx"]
+    right_ctx = vace_pipe["right_ctx"]
+    if "window_index" in vace_pipe:
+        # In-place window: drop the sampler's 4n+1 padding beyond the window length
+        vace_output = vace_output[:trim_end - trim_start]
+
+    # Splice modes: original[:trim_start] + vace_output + tail[trim_end:]
+    two_clip = vace_pipe.get("two_clip", False)
+    V = vace_output.shape[0]
+    tail_src = source_clip_2 if (two_clip and source_clip_2 is not None) else source_clip
+    need_blend = blend_method != "none" and (left_ctx > 0 or right_ctx > 0)
+
+    # Context zones read the inputs as views and blend into their own buffers
+    zones = []
+    left = right = None
+    if need_blend:
+        frame_shape = source_clip.shape[1:]
+        if left_ctx > 0:
+            n = min(left_ctx, max(0, source_clip.shape[0] - trim_start))
+            if n > 0:
+                left = torch.empty((n,) + frame_shape, dtype=dtype, device=source_clip.device)
+                alphas = [(j + 1) / (left_ctx + 1) for j in range(n)]
+                zones.append((left, source_clip[trim_start:trim_start + n], vace_output[:n], alphas))
+        if right_ctx > 0:
+            rs = trim_end - right_ctx
+            n = min(right_ctx, max(0, tail_src.shape[0] - rs))
+            if n > 0:
+                right = torch.empty((n,) + frame_shape, dtype=dtype, device=source_clip.device)
+                alphas = [1.0 - (j + 1) / (right_ctx + 1) for j in range(n)]
+                zones.append((right, tail_src[rs:rs + n], vace_output[V - right_ctx:V - right_ctx + n], alphas))
+        _blend_zones(zones, blend_method, of_preset, of_backend, workers, of_tile, of_cache)
+
+    # VACE frames with the blended zones laid over them; the right zone wins where the two meet,
+    # and a left zone running past a (truncated) right zone shows again after it
+    right_at = V - right_ctx if right is not None else V
+    right_end = right_at + right.shape[0] if right is not None else V
+    left_n = left.shape[0] if left is not None else 0
+    left_end = min(left_n, right_at)
+    pieces = [_frames_piece("source", source_clip, 0, trim_start)]
+    if left_end > 0:
+        pieces.append(_frames_piece("blend", left[:left_end]))
+    pieces.append(_frames_piece("vace", vace_output[left_end:right_at]))
+    if right is not None:
+        pieces.append(_frames_piece("blend", right))
+        if left_n > right_end:
+            pieces.append(_frames_piece("blend", left[right_end:]))
+    pieces.append(_frames_piece("vace", vace_output[max(right_end, left_n):]))
+    pieces.append(_frames_piece("tail", tail_src, trim_end))
+    return [piece for piece in pieces if piece[0] > 0]
+
+
+def _write_pieces(pieces, target, chunk=None, on_chunk=None):
+    """Write merge pieces back to back.
+
+    target(start, count) returns the (count, H, W, C) tensor that receives output frames
+    start..start + count. With chunk set, pieces are written at most chunk frames at a time and
+    on_chunk(start, frames) is called after each write — so the output can live on disk.
+    """
+    offset = 0
+    for count, write, _ in pieces:
+        step = chunk or count
+        for lo in range(0, count, step):
+            hi = min(lo + step, count)
+            out = target(offset + lo, hi - lo)
+            write(lo, hi, out)
+            if on_chunk is not None:
+                on_chunk(offset + lo, out)
+        offset += count
 
 
 class VACEMergeBack:
@@ -86,6 +583,10 @@ The pipe carries mode, trim bounds, and context frame counts for automatic blend
 
 Pass-through modes (Edge Extend, Frame Interpolation, Keyframe, Video Inpaint, Upscale):
   Returns vace_output as-is — the VACE output IS the final result.
+  Exception: a Video Inpaint pipe cropped by Source Prep (crop_to_mask) pastes the cropped
+  output back into source_clip, feathered over crop_feather pixels.
+  Pipes from VACE Source Prep (Windowed) are spliced like the modes below, blending across
+  the window overlaps.
 
 Splice modes (End, Pre, Middle, Join, Bidirectional, Replace):
   Reconstructs original[:trim_start] + vace_output + original[trim_end:]
@@ -105,82 +606,400 @@ Blend methods:
                 "vace_output": ("IMAGE", {"description": "VACE sampler output."}),
                 "vace_pipe": ("VACE_PIPE", {"description": "Pipe from VACE Source Prep carrying mode, trim bounds, and context counts."}),
                 "blend_method": (["optical_flow", "alpha", "none"], {"default": "optical_flow", "description": "Blending method at seams."}),
-                "of_preset": (["fast", "balanced", "quality", "max"], {"default": "balanced", "description": "Optical flow quality preset."}),
+                "of_preset": (list(OPTICAL_FLOW_PRESETS), {"default": "balanced", "description": "Optical flow quality preset. *_half / *_quarter estimate flow at reduced resolution (much faster at 1440p/4K)."}),
             },
             "optional": {
+                "of_backend": (["cv2", "torch"], {"default": "cv2", "description": OF_BACKEND_DESCRIPTION}),
+                "of_workers": ("INT", {"default": 0, "min": 0, "max": 256, "description": "Threads for optical flow across seam frames (0 = one per CPU). Output is identical for any value."}),
+                "of_tile": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 64, "description": "Optical flow tile size in pixels (0 = whole frame). Tiles bound flow/warp memory for 4K/8K masters."}),
+                "of_cache": (OF_CACHE_MODES, {"default": "off", "description": "Reuse optical flow fields computed for the same frame pair and preset (opt-in: cached flows are fp16, which can move pixels by one 8-bit level). memory+disk also keeps them across restarts (fp16 .npy in the user directory, or $VACE_FLOW_CACHE_DIR)."}),
                 "source_clip_2": ("IMAGE", {"description": "Second original clip for Join Extend with two separate clips."}),
+                "output_dtype": (["same", "fp32", "fp16", "bf16"], {"default": "same", "description": "Dtype of merged_clip. same keeps source_clip's dtype; blending runs in the output dtype."}),
+                "crop_feather": ("INT", {"default": 8, "min": 0, "max": 512, "description": "Video Inpaint crop: pixels over which a cropped result fades into the source at the crop edges (0 = hard paste)."}),
             },
         }
 
-    def merge(self, source_clip, vace_output, vace_pipe, blend_method, of_preset, source_clip_2=None):
-        mode = vace_pipe["mode"]
+    def merge(self, source_clip, vace_output, vace_pipe, blend_method, of_preset, source_clip_2=None, output_dtype="same", crop_feather=8,
+              of_backend="cv2", of_workers=0, of_tile=0, of_cache="off"):
+        dtype = OUTPUT_DTYPES.get(output_dtype, source_clip.dtype)
+        if _is_pass_through(vace_pipe):
+            return (vace_output.to(dtype) if output_dtype in OUTPUT_DTYPES else vace_output,)
+
+        pieces = _merge_pieces(source_clip, vace_output, vace_pipe, blend_method, of_preset, source_clip_2, dtype, crop_feather,
+                               of_backend, _resolve_workers(of_workers), of_tile, of_cache)
+        # Pre-allocate once and write every piece in place (avoids torch.cat allocation overhead)
+        total = sum(count for count, _, _ in pieces)
+        result = torch.empty((total,) + source_clip.shape[1:], dtype=dtype, device=source_clip.device)
+        _write_pieces(pieces, lambda start, count: result[start:start + count])
+        return (result,)
+
+
+_NPY_DTYPES = {torch.float32: np.float32, torch.float16: np.float16}
+
+
+def _stream_path(path, fmt):
+    """Absolute output path: relative paths go under ComfyUI's output directory; npy gets its extension."""
+    if not os.path.isabs(path):
+        import folder_paths
+        path = os.path.join(folder_paths.get_output_directory(), path)
+    if fmt == "npy" and not path.endswith(".npy"):
+        path += ".npy"
+    return path
+
+
+class VACEMergeBackToDisk:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "merge"
+    OUTPUT_NODE = True
+    RETURN_TYPES = ("IMAGE", "STRING", "INT")
+    RETURN_NAMES = ("preview", "path", "frame_count")
+    OUTPUT_TOOLTIPS = (
+        "A few frames sampled evenly from the merged video.",
+        "Where the merged video was written (.npy file or PNG frame directory).",
+        "Number of frames written.",
+    )
+    DESCRIPTION = """VACE Merge Back (To Disk) — VACE Merge Back that streams the result to disk.
+
+Same inputs and merge as VACE Merge Back, but the full video is never held in memory: frames are
+written chunk by chunk, untouched source ranges are copied in bulk, and only the seam zones are
+blended in RAM. Use it for sources too long to materialize as one IMAGE batch.
+
+Formats:
+  npy — one (frames, H, W, C) float array, appended chunk by chunk; open it lazily with
+        numpy.load(path, mmap_mode="r"). bf16 is stored as fp32.
+  png — 8-bit frames 000000.png, 000001.png, ... in a directory.
+
+Relative paths are resolved against ComfyUI's output directory."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        inputs = VACEMergeBack.INPUT_TYPES()
+        inputs["optional"]["source_clip"] = inputs["required"].pop("source_clip")
+        inputs["optional"]["source_frames"] = ("VACE_FRAMES", {"description": "Lazy source from VACE Frame Source, used instead of source_clip — untouched ranges are streamed from disk."})
+        inputs["required"]["output_path"] = ("STRING", {"default": "vace_merge/merged", "description": "Output .npy file or PNG frame directory. Relative paths go under the ComfyUI output directory."})
+        inputs["required"]["format"] = (["npy", "png"], {"default": "npy", "description": "npy: float array, memory-mappable with numpy.load(mmap_mode='r'). png: 8-bit frame directory."})
+        inputs["optional"]["output_dtype"] = (["same", "fp32", "fp16"], {"default": "same", "description": "npy dtype. same keeps source_clip's dtype (bf16 is stored as fp32)."})
+        inputs["optional"]["chunk_frames"] = ("INT", {"default": 64, "min": 1, "max": 4096, "description": "Frames written per chunk."})
+        inputs["optional"]["preview_frames"] = ("INT", {"default": 16, "min": 1, "max": 256, "description": "Frames sampled into the preview output."})
+        return inputs
+
+    def merge(self, source_clip=None, vace_output=None, vace_pipe=None, blend_method="optical_flow", of_preset="balanced",
+              output_path="vace_merge/merged", format="npy", source_clip_2=None, output_dtype="same", crop_feather=8,
+              of_backend="cv2", of_workers=0, of_tile=0, of_cache="off", chunk_frames=64, preview_frames=16, source_frames=None):
+        if source_frames is not None:
+            source_clip = source_frames
+        if source_clip is None:
+            raise ValueError("VACE Merge Back (To Disk): connect source_clip or source_frames.")
+        dtype = OUTPUT_DTYPES.get(output_dtype, source_clip.dtype)
+        if dtype not in _NPY_DTYPES:
+            dtype = torch.float32
+        pieces = _merge_pieces(source_clip, vace_output, vace_pipe, blend_method, of_preset, source_clip_2, dtype, crop_feather,
+                               of_backend, _resolve_workers(of_workers), of_tile, of_cache)
+        total = sum(count for count, _, _ in pieces)
+        frame_shape = tuple(vace_output.shape[1:]) if _is_pass_through(vace_pipe) else tuple(source_clip.shape[1:])
+        path = _stream_path(output_path, format)
+
+        picks = torch.linspace(0, total - 1, min(preview_frames, total)).round().long().unique().tolist()
+        preview = torch.empty((len(picks),) + frame_shape, dtype=dtype)
+        slots = {index: k for k, index in enumerate(picks)}
+
+        def keep_preview(start, frames):
+            for j in range(frames.shape[0]):
+                if start + j in slots:
+                    preview[slots[start + j]] = frames[j]
+
+        os.makedirs(path if format == "png" else (os.path.dirname(path) or "."), exist_ok=True)
+        buffer = torch.empty((min(chunk_frames, total),) + frame_shape, dtype=dtype, device=source_clip.device)
+        if format == "npy":
+            # Pieces arrive in output order, so the array body is appended chunk by chunk behind its header
+            with open(path, "wb") as f:
+                np.lib.format.write_array_header_1_0(f, {
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(_NPY_DTYPES[dtype])),
+                    "fortran_order": False,
+                    "shape": (total,) + frame_shape,
+                })
+
+                def written(start, frames):
+                    keep_preview(start, frames)
+                    frames.cpu().numpy().tofile(f)
+
+                _write_pieces(pieces, lambda start, count: buffer[:count], chunk_frames, written)
+        else:
+            from PIL import Image
+
+            def written(start, frames):
+                keep_preview(start, frames)
+                frames_u8 = (frames * 255).clamp(0, 255).to(torch.uint8).cpu().numpy()
+                for j, frame in enumerate(frames_u8):
+                    Image.fromarray(frame.squeeze(-1) if frame.shape[-1] == 1 else frame).save(
+                        os.path.join(path, f"{start + j:06d}.png"), compress_level=4)
+
+            _write_pieces(pieces, lambda start, count: buffer[:count], chunk_frames, written)
+
+        return (preview, path, total)
+
+
+def _latent_index(frame):
+    """Index of the Wan latent holding pixel frame `frame` (frame 0 alone, then groups of 4)."""
+    return -(-frame // LATENT_TEMPORAL)
+
+
+def _latent_alphas(first, last, frame_alpha):
+    """VACE weight per latent k in [first, last): the mean of frame_alpha over the frames it covers."""
+    alphas = []
+    for k in range(first, last):
+        frames = range(max(0, (k - 1) * LATENT_TEMPORAL + 1), k * LATENT_TEMPORAL + 1)
+        alphas.append(sum(frame_alpha(f) for f in frames) / len(frames))
+    return alphas
+
+
+class VACEMergeBackLatent:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "merge"
+    RETURN_TYPES = ("LATENT",)
+    RETURN_NAMES = ("merged_latent",)
+    OUTPUT_TOOLTIPS = (
+        "Full-length latent with the VACE latent spliced in — decode once for the final video.",
+    )
+    DESCRIPTION = """VACE Merge Back (Latent) — VACE Merge Back on Wan video latents instead of decoded frames.
+
+Connect the VAE-encoded full source, the sampler's output latent, and the vace_pipe from VACE
+Source Prep. The trim bounds and context counts are mapped onto the latent grid (latent 0 = frame 0,
+latent k = frames 4k-3..4k) and latents are spliced directly, so only the merged result needs a VAE
+decode.
+
+The source and VACE latent grids line up only when trim_start is a multiple of 4 and
+trim_end - (VACE frames) is too; otherwise the node raises an error. Pick split_index / input_left
+accordingly. The sampler's standalone first latent is replaced by the source latent ending at
+trim_start, so that frame always comes from the source.
+
+Blend methods:
+  none   — Hard cut at the trim bounds
+  alpha  — Linear crossfade of the latents across the context zones
+
+Pass-through modes return vace_latent as-is; a cropped Video Inpaint result is pasted back into
+source_latent at the crop rectangle / 8, feathered over crop_feather / 8 latent pixels."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "source_latent": ("LATENT", {"description": "VAE-encoded full original video (before any trimming)."}),
+                "vace_latent": ("LATENT", {"description": "VACE sampler output latent, before decoding."}),
+                "vace_pipe": ("VACE_PIPE", {"description": "Pipe from VACE Source Prep carrying mode, trim bounds, and context counts."}),
+                "blend_method": (["alpha", "none"], {"default": "alpha", "description": "Blending method at seams."}),
+            },
+            "optional": {
+                "source_latent_2": ("LATENT", {"description": "Second original clip's latent for Join Extend with two separate clips."}),
+                "crop_feather": ("INT", {"default": 8, "min": 0, "max": 512, "description": "Video Inpaint crop: pixels over which a cropped result fades into the source at the crop edges (0 = hard paste)."}),
+            },
+        }
+
+    def merge(self, source_latent, vace_latent, vace_pipe, blend_method, source_latent_2=None, crop_feather=8):
+        source = source_latent["samples"]
+        vace = vace_latent["samples"]
+        if source.ndim != 5 or vace.ndim != 5:
+            raise ValueError("VACE Merge Back (Latent) expects video latents (B, C, T, H, W).")
+
+        merged = dict(source_latent)
+        merged.pop("noise_mask", None)
+
+        crop = vace_pipe.get("crop")
+        if crop is not None:
+            merged["samples"] = self._paste_crop(source, vace, crop, crop_feather)
+            return (merged,)
+        if _is_pass_through(vace_pipe):
+            return (vace_latent,)
+
         trim_start = vace_pipe["trim_start"]
         trim_end = vace_pipe["trim_end"]
         left_ctx = vace_pipe["left_ctx"]
         right_ctx = vace_pipe["right_ctx"]
-
-        # Pass-through modes: VACE output IS the final result
-        if mode in PASS_THROUGH_MODES:
-            return (vace_output,)
-
-        # Splice modes: reconstruct full video
+        if "window_index" in vace_pipe:
+            # In-place window: drop the sampler's 4n+1 padding beyond the window length
+            vace = vace[:, :, :_latent_index(trim_end - trim_start - 1) + 1]
+        V = (vace.shape[2] - 1) * LATENT_TEMPORAL + 1
         two_clip = vace_pipe.get("two_clip", False)
-        V = vace_output.shape[0]
-        tail_src = source_clip_2 if (two_clip and source_clip_2 is not None) else source_clip
-        tail_len = max(0, tail_src.shape[0] - trim_end)
-        total = trim_start + V + tail_len
-        need_blend = blend_method != "none" and (left_ctx > 0 or right_ctx > 0)
-
-        # Clone only the small context slices needed for blending
-        # so the full source/vace tensors aren't held during the blend loop
-        left_orig_ctx = left_vace_ctx = right_orig_ctx = right_vace_ctx = None
-        if need_blend:
+        tail = source_latent_2["samples"] if (two_clip and source_latent_2 is not None) else source
+        tail_frames = (tail.shape[2] - 1) * LATENT_TEMPORAL + 1
+        if source.shape[3:] != vace.shape[3:] or tail.shape[3:] != vace.shape[3:]:
+            raise ValueError(f"Latent sizes differ: source {tuple(source.shape[3:])}, VACE {tuple(vace.shape[3:])}.")
+
+        has_tail = trim_end < tail_frames
+        if trim_start % LATENT_TEMPORAL or (has_tail and (trim_end - V) % LATENT_TEMPORAL):
+            raise ValueError(
+                f"Latent merge needs trim_start ({trim_start}) and trim_end - VACE frames ({trim_end} - {V}) to be "
+                f"multiples of {LATENT_TEMPORAL} so the source and VACE latents cover the same frames. "
+                f"Adjust split_index / input_left / input_right, or merge decoded frames with VACE Merge Back."
+            )
+
+        # Output = source latents through frame trim_start, VACE latents 1.., tail latents from frame trim_end
+        head = _latent_index(trim_start) + 1 if trim_start > 0 else 0
+        first = 1 if trim_start > 0 else 0
+        tail_from = _latent_index(trim_end) if has_tail else tail.shape[2]
+        parts = [source[:, :, :head].to(vace.dtype), vace[:, :, first:].clone(), tail[:, :, tail_from:].to(vace.dtype)]
+        result = torch.cat(parts, dim=2)
+
+        if blend_method != "none":
+            body = result[:, :, head:head + vace.shape[2] - first]
+            # VACE latent k sits on source latent k + left_shift and tail latent k + right_shift
+            left_shift = trim_start // LATENT_TEMPORAL
+            right_shift = (trim_end - V) // LATENT_TEMPORAL
             if left_ctx > 0:
-                n = min(left_ctx, max(0, source_clip.shape[0] - trim_start))
-                if n > 0:
-                    left_orig_ctx = source_clip[trim_start:trim_start + n].clone()
-                    left_vace_ctx = vace_output[:n].clone()
+                last = min(_latent_index(left_ctx - 1) + 1, vace.shape[2], source.shape[2] - left_shift)
+                alphas = _latent_alphas(first, last, lambda f: min(1.0, (f + 1) / (left_ctx + 1)))
+                self._blend(body[:, :, :last - first], source[:, :, first + left_shift:last + left_shift], alphas)
             if right_ctx > 0:
-                rs = trim_end - right_ctx
-                n = min(right_ctx, max(0, tail_src.shape[0] - rs))
-                if n > 0:
-                    right_orig_ctx = tail_src[rs:rs + n].clone()
-                    right_vace_ctx = vace_output[V - right_ctx:V - right_ctx + n].clone()
-
-        # Pre-allocate and copy in-place (avoids torch.cat allocation overhead)
-        result = torch.empty((total,) + source_clip.shape[1:], dtype=source_clip.dtype, device=source_clip.device)
-        result[:trim_start] = source_clip[:trim_start]
-        result[trim_start:trim_start + V] = vace_output
-        if tail_len > 0:
-            result[trim_start + V:] = tail_src[trim_end:]
-
-        if not need_blend:
-            return (result,)
-
-        def blend_frame(orig, vace, alpha):
-            if blend_method == "optical_flow":
-                return _optical_flow_blend(orig, vace, alpha, of_preset)
-            return _alpha_blend(orig, vace, alpha)
-
-        # Blend using saved context slices (not the full tensors)
-        if left_orig_ctx is not None:
-            for j in range(left_orig_ctx.shape[0]):
-                alpha = (j + 1) / (left_ctx + 1)
-                result[trim_start + j] = blend_frame(left_orig_ctx[j], left_vace_ctx[j], alpha)
-
-        if right_orig_ctx is not None:
-            for j in range(right_orig_ctx.shape[0]):
-                alpha = 1.0 - (j + 1) / (right_ctx + 1)
-                frame_idx = V - right_ctx + j
-                result[trim_start + frame_idx] = blend_frame(right_orig_ctx[j], right_vace_ctx[j], alpha)
+                lo = max(first, _latent_index(V - right_ctx))
+                if right_shift:
+                    # the standalone latent 0 of either grid has no counterpart on the other
+                    lo = max(lo, 1, 1 - right_shift)
+                hi = min(vace.shape[2], tail.shape[2] - right_shift)
+                if hi > lo:
+                    alphas = _latent_alphas(lo, hi, lambda f: min(1.0, (V - f) / (right_ctx + 1)))
+                    self._blend(body[:, :, lo - first:hi - first], tail[:, :, lo + right_shift:hi + right_shift], alphas)
+
+        merged["samples"] = result
+        return (merged,)
+
+    @staticmethod
+    def _blend(out, source, alphas):
+        """Crossfade out (holding VACE latents) from source by per-latent VACE weights, in place."""
+        if not alphas:
+            return
+        weights = torch.tensor(alphas, dtype=out.dtype, device=out.device).view(1, 1, -1, 1, 1)
+        out.copy_(torch.lerp(source.to(out.dtype), out, weights))
+
+    @staticmethod
+    def _paste_crop(source, vace, crop, feather):
+        top, left, bottom, right = crop
+        if top % LATENT_SPATIAL or left % LATENT_SPATIAL:
+            raise ValueError(f"Crop {crop} does not start on the {LATENT_SPATIAL}-pixel latent grid.")
+        latent_crop = (top // LATENT_SPATIAL, left // LATENT_SPATIAL, -(-bottom // LATENT_SPATIAL), -(-right // LATENT_SPATIAL))
+        lt, ll, lb, lr = latent_crop
+        if vace.shape[3:] != (lb - lt, lr - ll):
+            raise ValueError(
+                f"Crop merge: vace_latent is {vace.shape[3]}x{vace.shape[4]} but the crop recorded "
+                f"in vace_pipe is {lb - lt}x{lr - ll} latent pixels."
+            )
+        result = source.to(dtype=vace.dtype, copy=True)
+        n = min(vace.shape[2], source.shape[2])
+        region = result[:, :, :n, lt:lb, ll:lr]
+        feather = feather // LATENT_SPATIAL
+        if feather > 0:
+            weights = _feather_weights(latent_crop, source.shape[3], source.shape[4], feather, vace.dtype, vace.device)
+            region.lerp_(vace[:, :, :n], weights.squeeze(-1))
+        else:
+            region.copy_(vace[:, :, :n])
+        return result
+
+
+class VACEMergeBackWindows:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "merge"
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("merged_clip",)
+    OUTPUT_TOOLTIPS = (
+        "Full video with every window stitched in and each overlap blended.",
+    )
+    DESCRIPTION = """VACE Merge Back (Windowed) — stitches all windows from VACE Source Prep (Windowed) in one pass.
+
+Takes the whole list of window outputs and pipes at once. The output is allocated once, and
+each source frame is written exactly once. Chaining one VACE Merge Back per window would
+instead copy the full video N times.
+
+Consecutive windows are blended across their overlap, fading from the earlier window into
+the later one. Blending uses the same alpha / optical-flow machinery as VACE Merge Back.
+Frames covered by no window are copied from source_clip.
+
+vace_output may be a list (one output per window) or a single batch holding the window
+outputs back to back, each padded to 4n+1."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "source_clip": ("IMAGE", {"description": "Full original video (before windowing)."}),
+                "vace_output": ("IMAGE", {"description": "VACE sampler outputs, one per window (list or concatenated batch)."}),
+                "vace_pipe": ("VACE_PIPE", {"description": "Window pipes from VACE Source Prep (Windowed)."}),
+                "blend_method": (["optical_flow", "alpha", "none"], {"default": "optical_flow", "description": "Blending method across window overlaps."}),
+                "of_preset": (list(OPTICAL_FLOW_PRESETS), {"default": "balanced", "description": "Optical flow quality preset. *_half / *_quarter estimate flow at reduced resolution (much faster at 1440p/4K)."}),
+            },
+            "optional": {
+                "of_backend": (["cv2", "torch"], {"default": "cv2", "description": OF_BACKEND_DESCRIPTION}),
+                "of_workers": ("INT", {"default": 0, "min": 0, "max": 256, "description": "Threads for optical flow across seam frames (0 = one per CPU). Output is identical for any value."}),
+                "of_tile": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 64, "description": "Optical flow tile size in pixels (0 = whole frame). Tiles bound flow/warp memory for 4K/8K masters."}),
+                "of_cache": (OF_CACHE_MODES, {"default": "off", "description": "Reuse optical flow fields computed for the same frame pair and preset (opt-in: cached flows are fp16, which can move pixels by one 8-bit level). memory+disk also keeps them across restarts (fp16 .npy in the user directory, or $VACE_FLOW_CACHE_DIR)."}),
+                "output_dtype": (["same", "fp32", "fp16", "bf16"], {"default": "same", "description": "Dtype of merged_clip. same keeps source_clip's dtype."}),
+            },
+        }
 
+    def merge(self, source_clip, vace_output, vace_pipe, blend_method, of_preset, output_dtype=("same",), of_backend=("cv2",),
+              of_workers=(0,), of_tile=(0,), of_cache=("off",)):
+        source_clip = source_clip[0]
+        blend_method = blend_method[0]
+        of_preset = of_preset[0]
+        output_dtype = output_dtype[0]
+        of_backend = of_backend[0]
+        workers = _resolve_workers(of_workers[0])
+        of_tile = of_tile[0]
+        of_cache = of_cache[0]
+        dtype = OUTPUT_DTYPES.get(output_dtype, source_clip.dtype)
+
+        if any("window_index" not in p for p in vace_pipe):
+            raise ValueError("VACE Merge Back (Windowed) needs pipes from VACE Source Prep (Windowed).")
+        windows = [(p["trim_start"], p["trim_end"]) for p in vace_pipe]
+        if len(vace_output) == 1 and len(windows) > 1:
+            # One batch holding every window's output back to back
+            offsets = [0]
+            for s, e in windows:
+                offsets.append(offsets[-1] + _snap_4n1(e - s))
+            vace_output = [vace_output[0][a:b] for a, b in zip(offsets, offsets[1:])]
+        if len(vace_output) != len(windows):
+            raise ValueError(f"Got {len(vace_output)} VACE outputs for {len(windows)} window pipes.")
+
+        order = sorted(range(len(windows)), key=lambda i: windows[i][0])
+        B = source_clip.shape[0]
+        result = torch.empty((B,) + source_clip.shape[1:], dtype=dtype, device=source_clip.device)
+
+        written = 0
+        prev = None
+        zones = []
+        for i in order:
+            start, end = windows[i]
+            out = vace_output[i][:end - start]
+            if out.shape[0] != end - start:
+                raise ValueError(f"Window {start}-{end}: VACE output has only {out.shape[0]} frames.")
+            if start > written:
+                result[written:start] = source_clip[written:start]
+            core = max(start, written)
+            if prev is not None and blend_method != "none" and written > start:
+                prev_start, prev_out = prev
+                n = written - start
+                alphas = [(j + 1) / (n + 1) for j in range(n)]
+                zones.append((result[start:written], prev_out[start - prev_start:written - prev_start], out[:n], alphas))
+            result[core:end] = out[core - start:]
+            written = max(written, end)
+            prev = (start, out)
+        if written < B:
+            result[written:] = source_clip[written:]
+
+        # Overlaps only read the window outputs, so all of them can be blended together at the end
+        _blend_zones(zones, blend_method, of_preset, of_backend, workers, of_tile, of_cache)
         return (result,)
 
 
 NODE_CLASS_MAPPINGS = {
     "VACEMergeBack": VACEMergeBack,
+    "VACEMergeBackWindows": VACEMergeBackWindows,
+    "VACEMergeBackToDisk": VACEMergeBackToDisk,
+    "VACEMergeBackLatent": VACEMergeBackLatent,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "VACEMergeBack": "VACE Merge Back",
+    "VACEMergeBackWindows": "VACE Merge Back (Windowed)",
+    "VACEMergeBackToDisk": "VACE Merge Back (To Disk)",
+    "VACEMergeBackLatent": "VACE Merge Back (Latent)",
 }
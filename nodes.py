@@ -1,4 +1,7 @@
 import torch
+import torch.nn.functional as F
+
+from .frame_source import FrameSource
 
 
 VACE_MODES = [
@@ -21,22 +24,170 @@ def _snap_4n1(n):
     return int(((n + 2) // 4) * 4 + 1)
 
 
-def _create_solid_batch(count, height, width, color_value, device="cpu"):
-    """Create a batch of solid-color frames (B, H, W, 3). Returns empty tensor if count <= 0."""
+BLACK = 0.0
+WHITE = 1.0
+GREY = 0.498
+
+OUTPUT_DTYPES = {
+    "fp32": torch.float32,
+    "fp16": torch.float16,
+    "bf16": torch.bfloat16,
+}
+
+# Wan VAE compression: 4x temporal (causal — first frame on its own), 8x spatial.
+LATENT_TEMPORAL = 4
+LATENT_SPATIAL = 8
+# Crop sizes must survive the VAE (8x) and Wan's 2x2 patch embedding.
+CROP_ALIGN = LATENT_SPATIAL * 2
+
+
+def _create_solid_batch(count, height, width, color_value, device="cpu", dtype=torch.float32, channels=3):
+    """Create a batch of solid-color frames (B, H, W, C) — or (B, H, W) masks with channels=None.
+
+    Returns empty tensor if count <= 0.
+    """
+    frame_shape = (height, width) if channels is None else (height, width, channels)
     if count <= 0:
-        return torch.empty((0, height, width, 3), dtype=torch.float32, device=device)
-    return torch.full((count, height, width, 3), color_value, dtype=torch.float32, device=device)
+        return torch.empty((0,) + frame_shape, dtype=dtype, device=device)
+    return torch.full((count,) + frame_shape, color_value, dtype=dtype, device=device)
+
+
+def _align_span(start, end, limit, align):
+    """Grow [start, end) outward onto the align grid (start floored, end rounded up).
+
+    When the aligned span would run past limit it is shifted back to end exactly at limit,
+    keeping its size; start then stays on the grid only if limit does. Falls back to the
+    whole [0, limit) when the aligned size alone exceeds limit.
+    """
+    start = start // align * align
+    end = -(-end // align) * align
+    if end > limit:
+        start, end = limit - (end - start), limit
+        if start < 0:
+            return 0, limit
+    return start, end
+
+
+def _mask_bbox(mask, padding, height, width):
+    """Union bounding box (top, left, bottom, right) of mask > 0 over all frames.
+
+    The box is padded by `padding` pixels and grown onto the CROP_ALIGN pixel grid: sizes are
+    multiples, and so are starts except for a box shifted back from the far edge of a frame
+    whose size is not a multiple (see _align_span). Returns None when the mask is empty or the
+    box would cover the whole frame.
+    """
+    active = (mask > 0).any(dim=0)
+    if not active.any():
+        return None
+    rows = active.any(dim=1).nonzero()
+    cols = active.any(dim=0).nonzero()
+    top, bottom = _align_span(max(0, int(rows[0]) - padding), min(height, int(rows[-1]) + 1 + padding), height, CROP_ALIGN)
+    left, right = _align_span(max(0, int(cols[0]) - padding), min(width, int(cols[-1]) + 1 + padding), width, CROP_ALIGN)
+    if (top, left, bottom, right) == (0, 0, height, width):
+        return None
+    return (top, left, bottom, right)
+
+
+def _plan_windows(total, window_frames, overlap):
+    """Split [0, total) into overlapping windows of window_frames (snapped to 4n+1) frames.
+
+    Windows advance by window_frames - overlap; the last one is pulled back to end exactly at
+    total, so every window keeps the full 4n+1 length and only the final overlap grows.
+    No frame is ever covered by more than two windows, so each overlap blends exactly one pair.
+    Returns a list of (start, end).
+    """
+    window = _snap_4n1(window_frames)
+    if window >= total:
+        return [(0, total)]
+    if overlap > window // 2:
+        raise ValueError(
+            f"overlap_frames ({overlap}) must be at most half the window ({window // 2} of {window} frames) — "
+            f"a larger overlap makes three windows share frames."
+        )
+    starts = list(range(0, total - window, window - overlap)) + [total - window]
+    if len(starts) >= 3 and starts[-1] < starts[-3] + window:
+        # The pulled-back last window reaches into the one two back: drop the window between them
+        del starts[-2]
+    return [(s, s + window) for s in starts]
+
+
+def _frame_values(keep):
+    """Per-frame mask values (T,) from a keep vector — BLACK where kept, WHITE elsewhere."""
+    return torch.where(keep, BLACK, WHITE).to(torch.float32)
+
+
+def _expand_mask(values, height, width, compact=False):
+    """Expand per-frame (T,) or per-pixel (T, H, W) mask values to the (T, H, W, 3) IMAGE layout.
+
+    With compact=True the result is a stride-0 view over values instead of a contiguous copy:
+    same shape and contents, but it must be treated as read-only.
+    """
+    if values.dim() == 1:
+        values = values.view(-1, 1, 1)
+    mask = values.unsqueeze(-1).expand(-1, height, width, 3)
+    return mask if compact else mask.contiguous()
+
+
+def _latent_mask(values, height, width):
+    """Downsample mask values straight to the VACE latent grid ((T-1)/4+1, H/8, W/8).
+
+    Latent frame 0 covers pixel frame 0 and latent frame k covers frames 4k-3..4k, matching the
+    causal VAE. Each latent cell takes the max of the pixels it covers, so a region marked for
+    generation is never dropped. Frames past the end of the mask, up to the 4n+1 length
+    (_snap_4n1), count as generated.
+    """
+    lh = -(-height // LATENT_SPATIAL)
+    lw = -(-width // LATENT_SPATIAL)
+    if values.dim() == 1:
+        pooled = values.view(-1, 1, 1).expand(-1, lh, lw)
+    elif values.shape[0] > 1 and values.stride(0) == 0:
+        # single mask broadcast to every frame — pool it once
+        pooled = F.max_pool2d(values[:1].unsqueeze(1), LATENT_SPATIAL, ceil_mode=True).squeeze(1)
+        pooled = pooled.expand(values.shape[0], -1, -1)
+    else:
+        pooled = F.max_pool2d(values.unsqueeze(1), LATENT_SPATIAL, ceil_mode=True).squeeze(1)
+    T = pooled.shape[0]
+    pad = _snap_4n1(T) - T
+    if pad > 0:
+        pooled = torch.cat([pooled, _create_solid_batch(pad, lh, lw, WHITE, pooled.device, pooled.dtype, channels=None)], dim=0)
+    groups = pooled[1:].reshape(-1, LATENT_TEMPORAL, lh, lw).amax(dim=1)
+    return torch.cat([pooled[:1], groups], dim=0)
+
+
+def _assemble(clip, total, placements, dtype):
+    """Build (control_frames, mask values) for a frame layout; control_frames is a single preallocated buffer.
+
+    placements is a list of (dst, frames) where frames is a slice of clip and dst is either the
+    output start index of a contiguous run or a 1-D LongTensor of output positions (scattered
+    frames, written with a single index_copy_). Every output frame not covered by a placement is
+    generated: GREY in control_frames, WHITE in mask.
+    """
+    _, H, W, C = clip.shape
+    dev = clip.device
+    control_frames = torch.empty((total, H, W, C), dtype=dtype, device=dev)
+    keep = torch.zeros(total, dtype=torch.bool, device=dev)
+    for dst, frames in placements:
+        if isinstance(dst, torch.Tensor):
+            control_frames.index_copy_(0, dst, frames.to(dtype))
+            keep[dst] = True
+        else:
+            n = frames.shape[0]
+            control_frames[dst:dst + n] = frames
+            keep[dst:dst + n] = True
+    control_frames[~keep] = GREY
+    return control_frames, _frame_values(keep)
 
 
 class VACEMaskGenerator:
     CATEGORY = "VACE Tools"
     FUNCTION = "generate"
-    RETURN_TYPES = ("IMAGE", "IMAGE", "INT")
-    RETURN_NAMES = ("control_frames", "mask", "target_frames")
+    RETURN_TYPES = ("IMAGE", "IMAGE", "INT", "MASK")
+    RETURN_NAMES = ("control_frames", "mask", "target_frames", "latent_mask")
     OUTPUT_TOOLTIPS = (
         "Visual reference for VACE — source pixels where mask is black, grey (#7f7f7f) fill where mask is white.",
         "Mask sequence — black (0) = keep original, white (1) = generate. Per-frame for most modes; per-pixel for Video Inpaint.",
         "Total frame count snapped to 4n+1 (1, 5, 9, …, 81, …) — wire directly to VACE encode.",
+        "Mask at Wan latent resolution ((T-1)/4+1, H/8, W/8), max-pooled so any generated pixel marks its latent cell.",
     )
     DESCRIPTION = """VACE Mask Generator — builds mask + control_frames sequences for all VACE generation modes.
 
@@ -62,6 +213,8 @@ Parameter usage by mode:
   edge_frames        : Edge, Join, Replace/Inpaint
   inpaint_mask       : Video Inpaint only
   keyframe_positions : Keyframe — frame placement; Upscale — indices to anchor exactly (reuse same value)
+  mask_format        : all modes — "broadcast" returns the mask as a read-only stride-0 view (less memory)
+  output_dtype       : all modes — fp32 (default), fp16 or bf16 outputs, or same as trimmed_clip
 
 Note: trimmed_clip must not exceed target_frames for modes that use it.
 If your source is longer, use VACE Source Prep upstream to trim it first."""
@@ -122,10 +275,42 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
                                        "Upscale mode: reuse the same value — these positions will be anchored exactly (black mask).",
                     },
                 ),
+                "mask_format": (
+                    ["full", "broadcast"],
+                    {
+                        "default": "full",
+                        "description": "full: contiguous (B,H,W,3) mask. broadcast: same shape and values, but a stride-0 view over "
+                                       "one value per frame (per pixel for Video Inpaint) — a third of the memory or less. "
+                                       "Read-only; use full if a downstream node edits the mask in place.",
+                    },
+                ),
+                "output_dtype": (
+                    ["fp32", "fp16", "bf16", "same"],
+                    {
+                        "default": "fp32",
+                        "description": "Dtype of control_frames and both masks. fp16/bf16 halve memory for long clips; same follows trimmed_clip.",
+                    },
+                ),
             },
         }
 
-    def generate(self, trimmed_clip, mode, target_frames, split_index, edge_frames, inpaint_mask=None, keyframe_positions=None):
+    def generate(self, trimmed_clip, mode, target_frames, split_index, edge_frames, inpaint_mask=None, keyframe_positions=None,
+                 mask_format="full", output_dtype="fp32"):
+        _, H, W, _ = trimmed_clip.shape
+        dtype = OUTPUT_DTYPES.get(output_dtype, trimmed_clip.dtype)
+        control_frames, mask_values, target_frames = self._build(
+            trimmed_clip, mode, target_frames, split_index, edge_frames, inpaint_mask, keyframe_positions, dtype,
+        )
+        mask_values = mask_values.to(dtype)
+        mask = _expand_mask(mask_values, H, W, compact=(mask_format == "broadcast"))
+        return (control_frames, mask, target_frames, _latent_mask(mask_values, H, W))
+
+    def _build(self, trimmed_clip, mode, target_frames, split_index, edge_frames, inpaint_mask, keyframe_positions, dtype):
+        """Run the mode logic; returns (control_frames, mask values, target_frames).
+
+        Mask values are per-frame (T,) for every mode except Video Inpaint, which returns the
+        per-pixel (T, H, W) inpaint mask. generate() expands them to the IMAGE layout.
+        """
         B, H, W, C = trimmed_clip.shape
         dev = trimmed_clip.device
         target_frames = _snap_4n1(target_frames)
@@ -138,25 +323,19 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
                 "Use VACE Source Prep to trim long clips."
             )
 
-        BLACK = 0.0
-        WHITE = 1.0
-        GREY = 0.498
-
-        def solid(count, color):
-            return _create_solid_batch(count, H, W, color, dev)
+        def assemble(total, placements):
+            return _assemble(trimmed_clip, total, placements, dtype)
 
         if mode == "End Extend":
             frames_to_generate = target_frames - B
-            mask = torch.cat([solid(B, BLACK), solid(frames_to_generate, WHITE)], dim=0)
-            control_frames = torch.cat([trimmed_clip, solid(frames_to_generate, GREY)], dim=0)
+            control_frames, mask = assemble(B + frames_to_generate, [(0, trimmed_clip)])
             return (control_frames, mask, target_frames)
 
         elif mode == "Pre Extend":
             image_a = trimmed_clip[:split_index]
             a_count = image_a.shape[0]
             frames_to_generate = target_frames - a_count
-            mask = torch.cat([solid(frames_to_generate, WHITE), solid(a_count, BLACK)], dim=0)
-            control_frames = torch.cat([solid(frames_to_generate, GREY), image_a], dim=0)
+            control_frames, mask = assemble(frames_to_generate + a_count, [(frames_to_generate, image_a)])
             return (control_frames, mask, target_frames)
 
         elif mode == "Middle Extend":
@@ -172,8 +351,10 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
             a_count = image_a.shape[0]
             b_count = image_b.shape[0]
             frames_to_generate = target_frames - (a_count + b_count)
-            mask = torch.cat([solid(a_count, BLACK), solid(frames_to_generate, WHITE), solid(b_count, BLACK)], dim=0)
-            control_frames = torch.cat([image_a, solid(frames_to_generate, GREY), image_b], dim=0)
+            control_frames, mask = assemble(
+                a_count + frames_to_generate + b_count,
+                [(0, image_a), (a_count + frames_to_generate, image_b)],
+            )
             return (control_frames, mask, target_frames)
 
         elif mode == "Edge Extend":
@@ -181,9 +362,11 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
             end_seg = trimmed_clip[-edge_frames:]
             start_count = start_seg.shape[0]
             end_count = end_seg.shape[0]
-            frames_to_generate = target_frames - (start_count + end_count)
-            mask = torch.cat([solid(end_count, BLACK), solid(frames_to_generate, WHITE), solid(start_count, BLACK)], dim=0)
-            control_frames = torch.cat([end_seg, solid(frames_to_generate, GREY), start_seg], dim=0)
+            frames_to_generate = max(0, target_frames - (start_count + end_count))
+            control_frames, mask = assemble(
+                end_count + frames_to_generate + start_count,
+                [(0, end_seg), (end_count + frames_to_generate, start_seg)],
+            )
             return (control_frames, mask, target_frames)
 
         elif mode == "Join Extend":
@@ -195,8 +378,10 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
             p2_count = part_2.shape[0]
             p3_count = part_3.shape[0]
             frames_to_generate = target_frames - (p2_count + p3_count)
-            mask = torch.cat([solid(p2_count, BLACK), solid(frames_to_generate, WHITE), solid(p3_count, BLACK)], dim=0)
-            control_frames = torch.cat([part_2, solid(frames_to_generate, GREY), part_3], dim=0)
+            control_frames, mask = assemble(
+                p2_count + frames_to_generate + p3_count,
+                [(0, part_2), (p2_count + frames_to_generate, part_3)],
+            )
             return (control_frames, mask, target_frames)
 
         elif mode == "Bidirectional Extend":
@@ -206,23 +391,15 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
             else:
                 pre_count = frames_to_generate // 2
             post_count = frames_to_generate - pre_count
-            mask = torch.cat([solid(pre_count, WHITE), solid(B, BLACK), solid(post_count, WHITE)], dim=0)
-            control_frames = torch.cat([solid(pre_count, GREY), trimmed_clip, solid(post_count, GREY)], dim=0)
+            control_frames, mask = assemble(pre_count + B + post_count, [(pre_count, trimmed_clip)])
             return (control_frames, mask, target_frames)
 
         elif mode == "Frame Interpolation":
             step = max(split_index, 1)
             frames_to_generate = (B - 1) * step
-            mask_parts = []
-            ctrl_parts = []
-            for i in range(B):
-                mask_parts.append(solid(1, BLACK))
-                ctrl_parts.append(trimmed_clip[i:i+1])
-                if i < B - 1:
-                    mask_parts.append(solid(step, WHITE))
-                    ctrl_parts.append(solid(step, GREY))
-            mask = torch.cat(mask_parts, dim=0)
-            control_frames = torch.cat(ctrl_parts, dim=0)
+            # Source frame i lands at i * (step + 1); the gaps between are generated.
+            positions = torch.arange(B, device=dev) * (step + 1)
+            control_frames, mask = assemble(B + frames_to_generate, [(positions, trimmed_clip)])
             return (control_frames, mask, _snap_4n1(B + frames_to_generate))
 
         elif mode == "Replace/Inpaint":
@@ -237,14 +414,13 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
             frames_to_generate = length
             before = trimmed_clip[:start]
             after = trimmed_clip[end:]
-            mask = torch.cat([solid(before.shape[0], BLACK), solid(length, WHITE), solid(after.shape[0], BLACK)], dim=0)
-            control_frames = torch.cat([before, solid(length, GREY), after], dim=0)
+            control_frames, mask = assemble(B, [(0, before), (end, after)])
             return (control_frames, mask, _snap_4n1(B))
 
         elif mode == "Video Inpaint":
             if inpaint_mask is None:
                 raise ValueError("Video Inpaint mode requires the inpaint_mask input to be connected.")
-            m = inpaint_mask.to(dev)                       # (Bm, Hm, Wm) MASK type
+            m = inpaint_mask.to(dev, dtype)                # (Bm, Hm, Wm) MASK type
             if m.shape[1] != H or m.shape[2] != W:
                 raise ValueError(
                     f"Video Inpaint: inpaint_mask spatial size {m.shape[1]}x{m.shape[2]} "
@@ -258,10 +434,11 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
                     f"Video Inpaint: inpaint_mask has {m.shape[0]} frames but trimmed_clip has {B}. "
                     "Must match or be 1 frame."
                 )
-            m3 = m.unsqueeze(-1).expand(-1, -1, -1, 3).contiguous()  # (B,H,W) -> (B,H,W,3)
-            mask = m3
-            grey = torch.full_like(trimmed_clip, GREY)
-            control_frames = trimmed_clip * (1.0 - m3) + grey * m3
+            mask = m
+            # source * (1 - m) + grey * m, broadcast from the (B,H,W,1) mask into one output buffer
+            control_frames = torch.empty((B, H, W, C), dtype=dtype, device=dev)
+            control_frames.copy_(trimmed_clip)
+            control_frames.lerp_(torch.full((), GREY, dtype=dtype, device=dev), m.unsqueeze(-1))
             return (control_frames, mask, _snap_4n1(B))
 
         elif mode == "Keyframe":
@@ -290,24 +467,9 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
                 else:
                     positions = [round(i * (target_frames - 1) / (B - 1)) for i in range(B)]
 
-            mask_parts, ctrl_parts = [], []
-            prev_end = 0
-            for i, pos in enumerate(positions):
-                gap = pos - prev_end
-                if gap > 0:
-                    mask_parts.append(solid(gap, WHITE))
-                    ctrl_parts.append(solid(gap, GREY))
-                mask_parts.append(solid(1, BLACK))
-                ctrl_parts.append(trimmed_clip[i:i+1])
-                prev_end = pos + 1
-
-            trailing = target_frames - prev_end
-            if trailing > 0:
-                mask_parts.append(solid(trailing, WHITE))
-                ctrl_parts.append(solid(trailing, GREY))
-
-            mask = torch.cat(mask_parts, dim=0)
-            control_frames = torch.cat(ctrl_parts, dim=0)
+            control_frames, mask = assemble(
+                target_frames, [(torch.tensor(positions, dtype=torch.long, device=dev), trimmed_clip)],
+            )
             return (control_frames, mask, target_frames)
 
         elif mode == "Upscale":
@@ -328,12 +490,12 @@ If your source is longer, use VACE Source Prep upstream to trim it first."""
             else:
                 anchor_set = set()
             # Build per-frame mask: anchored frames → BLACK (keep exactly), rest → WHITE (enhance)
-            black_frame = solid(1, BLACK)[0]
-            white_frame = solid(1, WHITE)[0]
-            mask = torch.stack([black_frame if i in anchor_set else white_frame for i in range(B)])
+            keep = torch.zeros(B, dtype=torch.bool, device=dev)
+            keep[sorted(anchor_set)] = True
+            mask = _frame_values(keep)
             # Unlike all other modes, control_frames uses real pixels (not grey) where mask=WHITE.
             # This gives VACE a concrete upscaled reference to refine from, rather than generating blind.
-            control_frames = trimmed_clip
+            control_frames = trimmed_clip.to(dtype)
             return (control_frames, mask, _snap_4n1(B))
 
         raise ValueError(f"Unknown mode: {mode}")
@@ -371,7 +533,7 @@ input_left / input_right (0 = use all available):
   Bidirectional:       input_left = trailing context frames to keep
   Frame Interpolation: pass-through (no trimming)
   Replace/Inpaint:     input_left/input_right = context frames around replace region
-  Video Inpaint:       pass-through (no trimming)
+  Video Inpaint:       pass-through (no trimming); crop_to_mask = crop to the mask's bounding box
   Keyframe:            pass-through (no trimming)
   Upscale:             pass-through; source_clip_2 = reference image(s) spliced at keyframe_positions"""
 
@@ -379,7 +541,6 @@ input_left / input_right (0 = use all available):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "source_clip": ("IMAGE", {"description": "Full source video frames (B,H,W,C tensor)."}),
                 "mode": (
                     VACE_MODES,
                     {
@@ -430,6 +591,13 @@ input_left / input_right (0 = use all available):
                 ),
             },
             "optional": {
+                "source_clip": ("IMAGE", {"description": "Full source video frames (B,H,W,C tensor). Required unless source_frames is connected."}),
+                "source_frames": (
+                    "VACE_FRAMES",
+                    {
+                        "description": "Lazy source from VACE Frame Source, used instead of source_clip — only the frames the mode keeps are read from disk.",
+                    },
+                ),
                 "source_clip_2": (
                     "IMAGE",
                     {
@@ -450,15 +618,60 @@ input_left / input_right (0 = use all available):
                         "description": "Keyframe positions pass-through for Keyframe mode.",
                     },
                 ),
+                "output_dtype": (
+                    ["same", "fp32", "fp16", "bf16"],
+                    {
+                        "default": "same",
+                        "description": "Dtype of trimmed_clip and inpaint_mask. same keeps source_clip's dtype; fp16/bf16 halve memory for long clips.",
+                    },
+                ),
+                "crop_to_mask": (
+                    "BOOLEAN",
+                    {
+                        "default": False,
+                        "description": "Video Inpaint: output only the union bounding box of inpaint_mask over all frames (padded, aligned to 16 px). "
+                                       "The crop is recorded in vace_pipe so VACE Merge Back can paste the result into the full frame.",
+                    },
+                ),
+                "crop_padding": (
+                    "INT",
+                    {
+                        "default": 32,
+                        "min": 0,
+                        "max": 4096,
+                        "description": "Video Inpaint crop: context pixels kept around the mask bounding box before alignment.",
+                    },
+                ),
             },
         }
 
-    def prepare(self, source_clip, mode, split_index, input_left, input_right, edge_frames, source_clip_2=None, inpaint_mask=None, keyframe_positions=None):
+    def prepare(self, source_clip=None, mode="End Extend", split_index=0, input_left=0, input_right=0, edge_frames=8, source_clip_2=None,
+                inpaint_mask=None, keyframe_positions=None, output_dtype="same", crop_to_mask=False, crop_padding=32, source_frames=None):
+        if source_frames is not None:
+            # FrameSource slices like a tensor but reads only the selected frames
+            source_clip = source_frames
+        if source_clip is None:
+            raise ValueError("VACE Source Prep: connect source_clip or source_frames.")
+        dtype = OUTPUT_DTYPES.get(output_dtype, source_clip.dtype)
+        output, mode, split_index, edge_frames, out_mask, kp_out, pipe = self._prepare(
+            source_clip, mode, split_index, input_left, input_right, edge_frames,
+            source_clip_2, inpaint_mask, keyframe_positions, dtype, crop_padding if crop_to_mask else None,
+        )
+        if isinstance(output, FrameSource):
+            # Pass-through modes keep every frame
+            output = output.load()
+        if output_dtype in OUTPUT_DTYPES:
+            out_mask = out_mask.to(dtype)
+        return (output.to(dtype), mode, split_index, edge_frames, out_mask, kp_out, pipe)
+
+    def _prepare(self, source_clip, mode, split_index, input_left, input_right, edge_frames, source_clip_2, inpaint_mask, keyframe_positions, dtype,
+                 crop_padding=None):
         B, H, W, C = source_clip.shape
         dev = source_clip.device
 
         def mask_ph():
-            return torch.zeros((1, H, W), dtype=torch.float32, device=dev)
+            # A fresh tensor per call: downstream nodes may edit the MASK output in place
+            return torch.full((1, H, W), BLACK, device=dev)
 
         def trim_mask(start, end):
             if inpaint_mask is None:
@@ -507,40 +720,44 @@ input_left / input_right (0 = use all available):
             right_end = min(B, split_index + input_right) if input_right > 0 else B
             output = source_clip[left_start:right_end]
             out_split = split_index - left_start
-            part_a = source_clip[left_start:split_index]
-            part_b = source_clip[split_index:right_end]
-            pipe = {"mode": mode, "trim_start": left_start, "trim_end": right_end, "left_ctx": out_split, "right_ctx": part_b.shape[0]}
+            pipe = {"mode": mode, "trim_start": left_start, "trim_end": right_end, "left_ctx": out_split, "right_ctx": right_end - split_index}
             return (output, mode, out_split, edge_frames, trim_mask(left_start, right_end), kp_out, pipe)
 
         elif mode == "Edge Extend":
             eff_left = min(input_left if input_left > 0 else edge_frames, B)
             eff_right = min(input_right if input_right > 0 else edge_frames, B)
             sym = min(eff_left, eff_right)
-            start_seg = source_clip[:sym]
-            end_seg = source_clip[-sym:] if sym > 0 else source_clip[:0]
-            output = torch.cat([start_seg, end_seg], dim=0)
+            if sym == 0 or 2 * sym == B:
+                # Head and tail meet: one contiguous range, returned as a view
+                output = source_clip[:2 * sym]
+            else:
+                output = torch.cat([source_clip[:sym], source_clip[-sym:]], dim=0)
             pipe = {"mode": mode, "trim_start": 0, "trim_end": B, "left_ctx": 0, "right_ctx": 0}
             return (output, mode, 0, sym, mask_ph(), kp_out, pipe)
 
         elif mode == "Join Extend":
-            if source_clip_2 is not None:
-                first_half = source_clip
-                second_half = source_clip_2
+            # Work out the join window from the lengths alone, so a lazy source only reads the
+            # frames it keeps
+            two_clip = source_clip_2 is not None
+            if two_clip:
+                first_len, second_len = B, source_clip_2.shape[0]
             else:
                 half = B // 2
-                first_half = source_clip[:half]
-                second_half = source_clip[half:]
+                first_len, second_len = half, B - half
             eff_left = input_left if input_left > 0 else edge_frames
             eff_right = input_right if input_right > 0 else edge_frames
-            eff_left = min(eff_left, first_half.shape[0])
-            eff_right = min(eff_right, second_half.shape[0])
+            eff_left = min(eff_left, first_len)
+            eff_right = min(eff_right, second_len)
             sym = min(eff_left, eff_right)
-            part_2 = first_half[-sym:]
-            part_3 = second_half[:sym]
-            output = torch.cat([part_2, part_3], dim=0)
-            two_clip = source_clip_2 is not None
+            if sym == 0:
+                output = source_clip[:first_len]
+            elif two_clip:
+                output = torch.cat([source_clip[first_len - sym:], source_clip_2[:sym]], dim=0)
+            else:
+                # Both halves of one clip: the join window is a contiguous view
+                output = source_clip[half - sym:half + sym]
             if two_clip:
-                trim_start = first_half.shape[0] - sym
+                trim_start = first_len - sym
                 trim_end = sym
             else:
                 trim_start = half - sym
@@ -573,18 +790,23 @@ input_left / input_right (0 = use all available):
             length = end_idx - start
             ctx_start = max(0, start - input_left) if input_left > 0 else 0
             ctx_end = min(B, end_idx + input_right) if input_right > 0 else B
-            before = source_clip[ctx_start:start]
-            replace_region = source_clip[start:end_idx]
-            after = source_clip[end_idx:ctx_end]
-            output = torch.cat([before, replace_region, after], dim=0)
-            out_split = before.shape[0]
+            # before + replace region + after is one contiguous range of the source
+            output = source_clip[ctx_start:ctx_end]
+            out_split = start - ctx_start
             out_edge = length
-            pipe = {"mode": mode, "trim_start": ctx_start, "trim_end": ctx_end, "left_ctx": before.shape[0], "right_ctx": after.shape[0]}
+            pipe = {"mode": mode, "trim_start": ctx_start, "trim_end": ctx_end, "left_ctx": out_split, "right_ctx": ctx_end - end_idx}
             return (output, mode, out_split, out_edge, trim_mask(ctx_start, ctx_end), kp_out, pipe)
 
         elif mode == "Video Inpaint":
             out_mask = inpaint_mask.to(dev) if inpaint_mask is not None else mask_ph()
             pipe = {"mode": mode, "trim_start": 0, "trim_end": B, "left_ctx": 0, "right_ctx": 0}
+            if crop_padding is not None and inpaint_mask is not None:
+                box = _mask_bbox(out_mask, crop_padding, H, W)
+                if box is not None:
+                    top, left, bottom, right = box
+                    pipe["crop"] = box
+                    return (source_clip[:, top:bottom, left:right], mode, split_index, edge_frames,
+                            out_mask[:, top:bottom, left:right], kp_out, pipe)
             return (source_clip, mode, split_index, edge_frames, out_mask, kp_out, pipe)
 
         elif mode == "Keyframe":
@@ -592,7 +814,7 @@ input_left / input_right (0 = use all available):
             return (source_clip, mode, split_index, edge_frames, mask_ph(), kp_out, pipe)
 
         elif mode == "Upscale":
-            output = source_clip.clone()
+            output = source_clip
             if source_clip_2 is not None and keyframe_positions and keyframe_positions.strip():
                 try:
                     positions = [int(x.strip()) for x in keyframe_positions.split(",")]
@@ -608,24 +830,132 @@ input_left / input_right (0 = use all available):
                         f"Upscale: source_clip_2 has {n_ref} frames but keyframe_positions has {n_pos} positions — "
                         "must match, or provide 1 frame to use for all positions."
                     )
+                slots = {}
                 for i, pos in enumerate(positions):
                     if not (0 <= pos < B):
                         raise ValueError(
                             f"Upscale: keyframe_positions index {pos} is out of range — source_clip has {B} frames [0..{B-1}]."
                         )
-                    output[pos] = ref[0] if n_ref == 1 else ref[i]
+                    slots[pos] = 0 if n_ref == 1 else i
+                # Each output frame is written once: source runs between the keyframes, then the references
+                output = torch.empty((B, H, W, C), dtype=dtype, device=dev)
+                prev = 0
+                for pos in sorted(slots) + [B]:
+                    output[prev:pos] = source_clip[prev:pos]
+                    prev = pos + 1
+                order = sorted(slots)
+                output.index_copy_(0, torch.tensor(order, device=dev), ref[[slots[pos] for pos in order]].to(dtype))
             pipe = {"mode": mode, "trim_start": 0, "trim_end": B, "left_ctx": 0, "right_ctx": 0}
             return (output, mode, split_index, edge_frames, mask_ph(), kp_out, pipe)
 
         raise ValueError(f"Unknown mode: {mode}")
 
 
+WINDOWED_MODES = ["Video Inpaint", "Upscale"]
+
+
+class VACESourceWindows:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "prepare"
+    RETURN_TYPES = VACESourcePrep.RETURN_TYPES
+    RETURN_NAMES = VACESourcePrep.RETURN_NAMES
+    OUTPUT_IS_LIST = (True,) * len(VACESourcePrep.RETURN_TYPES)
+    OUTPUT_TOOLTIPS = (
+        "One trimmed clip per window — wire to VACE Mask Generator (runs once per window).",
+        "Selected mode, repeated per window.",
+        "split_index pass-through, repeated per window.",
+        "edge_frames pass-through, repeated per window.",
+        "Inpaint mask sliced to each window.",
+        "Upscale: keyframe_positions remapped to each window's local indices.",
+        "Per-window pipes with global trim bounds and overlap counts — wire to VACE Merge Back.",
+    )
+    DESCRIPTION = """VACE Source Prep (Windowed) — splits a long source into overlapping 4n+1 windows.
+
+For in-place modes (Video Inpaint, Upscale) on sources far longer than one sampler pass.
+Each output is a list with one entry per window, so downstream nodes run once per window
+with bounded memory. Every window is prepared exactly like VACE Source Prep would prepare it.
+Window clips are views into source_clip, not copies.
+
+window_frames:  frames per window (snapped to 4n+1)
+overlap_frames: frames shared by consecutive windows, at most half the window; the last
+                window is aligned to the end of the source, so its overlap can be larger
+
+Each window's vace_pipe carries its global trim bounds, and its left_ctx/right_ctx are the
+overlaps with its neighbours. VACE Merge Back splices a window pipe back into the full video
+and blends across those overlaps."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "source_clip": ("IMAGE", {"description": "Full source video frames (B,H,W,C tensor)."}),
+                "mode": (WINDOWED_MODES, {"default": "Video Inpaint", "description": "In-place mode to run per window."}),
+                "window_frames": ("INT", {"default": 81, "min": 1, "max": 10000, "description": "Frames per window, snapped to 4n+1."}),
+                "overlap_frames": ("INT", {"default": 8, "min": 0, "max": 10000, "description": "Frames shared by consecutive windows, blended at merge. At most half the window."}),
+            },
+            "optional": {
+                "source_clip_2": ("IMAGE", {"description": "Upscale: reference image(s) spliced at keyframe_positions — one per position, or one for all."}),
+                "inpaint_mask": ("MASK", {"description": "Video Inpaint: spatial mask, sliced per window. A single frame applies to every window."}),
+                "keyframe_positions": ("STRING", {"default": "", "description": "Upscale: anchor positions in the full source; remapped per window."}),
+                "output_dtype": (["same", "fp32", "fp16", "bf16"], {"default": "same", "description": "Dtype of trimmed clips and masks."}),
+            },
+        }
+
+    def prepare(self, source_clip, mode, window_frames, overlap_frames, source_clip_2=None, inpaint_mask=None, keyframe_positions=None,
+                output_dtype="same"):
+        if mode not in WINDOWED_MODES:
+            raise ValueError(f"Windowed prep supports {', '.join(WINDOWED_MODES)}, got '{mode}'.")
+        B = source_clip.shape[0]
+        windows = _plan_windows(B, window_frames, overlap_frames)
+
+        positions = []
+        if mode == "Upscale" and keyframe_positions and keyframe_positions.strip():
+            try:
+                positions = [int(x.strip()) for x in keyframe_positions.split(",")]
+            except ValueError:
+                raise ValueError(
+                    f"Upscale: keyframe_positions must be comma-separated integers, got: '{keyframe_positions}'"
+                )
+            out_of_range = [p for p in positions if not (0 <= p < B)]
+            if out_of_range:
+                raise ValueError(
+                    f"Upscale: keyframe_positions {out_of_range} are out of range — source_clip has {B} frames [0..{B-1}]."
+                )
+
+        prep = VACESourcePrep()
+        outputs = [[] for _ in self.RETURN_TYPES]
+        for i, (start, end) in enumerate(windows):
+            window_mask = inpaint_mask
+            if inpaint_mask is not None and inpaint_mask.shape[0] > 1:
+                window_mask = inpaint_mask[start:end]
+            local = [(j, p - start) for j, p in enumerate(positions) if start <= p < end]
+            window_refs = None
+            if source_clip_2 is not None and local:
+                window_refs = source_clip_2 if source_clip_2.shape[0] == 1 else source_clip_2[[j for j, _ in local]]
+            result = prep.prepare(
+                source_clip[start:end], mode, 0, 0, 0, 1,
+                source_clip_2=window_refs, inpaint_mask=window_mask,
+                keyframe_positions=",".join(str(p) for _, p in local), output_dtype=output_dtype,
+            )
+            pipe = {
+                "mode": mode, "trim_start": start, "trim_end": end,
+                "left_ctx": windows[i - 1][1] - start if i > 0 else 0,
+                "right_ctx": end - windows[i + 1][0] if i + 1 < len(windows) else 0,
+                "window_index": i, "window_count": len(windows),
+            }
+            for out, value in zip(outputs, result[:-1] + (pipe,)):
+                out.append(value)
+        return tuple(outputs)
+
+
 NODE_CLASS_MAPPINGS = {
     "VACEMaskGenerator": VACEMaskGenerator,
     "VACESourcePrep": VACESourcePrep,
+    "VACESourceWindows": VACESourceWindows,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "VACEMaskGenerator": "VACE Mask Generator",
     "VACESourcePrep": "VACE Source Prep",
+    "VACESourceWindows": "VACE Source Prep (Windowed)",
 }
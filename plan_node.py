@@ -0,0 +1,332 @@
+import json
+
+import torch
+
+from .nodes import BLACK, OUTPUT_DTYPES, VACE_MODES, VACEMaskGenerator, VACESourcePrep, _snap_4n1
+from .merge_node import VACEMergeBack, _merge_pieces
+
+
+def _nbytes(t):
+    return t.numel() * t.element_size()
+
+
+def _allocated(t, inputs):
+    """Bytes a node output newly allocates — views of (or identity with) its inputs cost nothing."""
+    if any(t is i for i in inputs) or t._is_view():
+        return 0
+    return _nbytes(t)
+
+
+def _runs(values):
+    """Collapse per-frame mask values into [{kind, start, end}] runs of kept / generated frames."""
+    runs = []
+    for i, v in enumerate(values):
+        kind = "keep" if v == BLACK else "generate"
+        if runs and runs[-1]["kind"] == kind:
+            runs[-1]["end"] = i + 1
+        else:
+            runs.append({"kind": kind, "start": i, "end": i + 1})
+    return runs
+
+
+def _run_nodes(frames, height, width, channels, dtype, device, mode, split_index, input_left, input_right, edge_frames,
+               target_frames, second_frames, keyframe_positions, blend_method, mask_format, mask_dtype):
+    """Run Source Prep → Mask Generator → Merge Back on uninitialized inputs of the given frame size."""
+    source = torch.empty((frames, height, width, channels), dtype=dtype, device=device)
+    positions = [p for p in (keyframe_positions or "").split(",") if p.strip()]
+    source_2 = None
+    if mode == "Join Extend" and second_frames > 0:
+        source_2 = torch.empty((second_frames, height, width, channels), dtype=dtype, device=device)
+    elif mode == "Upscale" and positions:
+        source_2 = torch.empty((len(positions), height, width, channels), dtype=dtype, device=device)
+    inpaint_mask = None
+    if mode == "Video Inpaint":
+        inpaint_mask = torch.ones((frames, height, width), dtype=torch.float32, device=device)
+
+    prep = VACESourcePrep().prepare(
+        source, mode, split_index, input_left, input_right, edge_frames,
+        source_clip_2=source_2, inpaint_mask=inpaint_mask, keyframe_positions=keyframe_positions,
+    )
+    trimmed, _, out_split, out_edge, out_mask, kp_out, pipe = prep
+    mask_gen = VACEMaskGenerator().generate(
+        trimmed, mode, target_frames, out_split, out_edge,
+        inpaint_mask=out_mask if mode == "Video Inpaint" else None, keyframe_positions=kp_out,
+        mask_format=mask_format, output_dtype=mask_dtype,
+    )
+    vace_output = torch.empty(mask_gen[0].shape, dtype=dtype, device=device)
+    # Outputs do not depend on the blend, and optical flow cannot run on shape-only tensors
+    blend = "none" if blend_method == "none" else "alpha"
+    merged = VACEMergeBack().merge(source, vace_output, pipe, blend, "fast", source_clip_2=source_2)[0]
+    pieces = _merge_pieces(source, vace_output, pipe, blend, "fast", source_2, dtype, 0, "cv2", 1, 0, "off")
+    return {
+        "inputs": [source] + ([source_2] if source_2 is not None else []),
+        "prep": prep, "mask_gen": mask_gen, "vace_output": vace_output, "merged": merged, "pieces": pieces,
+    }
+
+
+def vace_plan(frames, height, width, mode, split_index=0, input_left=0, input_right=0, edge_frames=8, target_frames=81,
+              channels=3, source_dtype="fp32", second_frames=0, keyframe_positions="", blend_method="optical_flow",
+              mask_format="full", mask_dtype="fp32"):
+    """Dry-run a Source Prep → Mask Generator → sampler → Merge Back job and return its plan as a dict.
+
+    The node logic runs twice without touching real frames: on meta tensors of the full frame
+    size for exact shapes and byte counts, and on 1x1-pixel CPU frames to read the mask layout.
+    Byte estimates count each node's newly allocated outputs; views of inputs are free.
+    Video Inpaint is planned with an all-white mask and no crop.
+    """
+    args = (mode, split_index, input_left, input_right, edge_frames, target_frames, second_frames, keyframe_positions,
+            blend_method, mask_format, mask_dtype)
+    full = _run_nodes(frames, height, width, channels, OUTPUT_DTYPES[source_dtype], "meta", *args)
+    tiny = _run_nodes(frames, 1, 1, channels, torch.float32, "cpu", *args)
+
+    inputs = full["inputs"]
+    trimmed, _, out_split, out_edge, _, _, pipe = full["prep"]
+    control_frames, mask, target, latent_mask = full["mask_gen"]
+    vace_output, merged = full["vace_output"], full["merged"]
+
+    values = tiny["mask_gen"][1][:, 0, 0, 0].tolist()
+    runs = _runs(values)
+    kept = sum(r["end"] - r["start"] for r in runs if r["kind"] == "keep")
+    layout = []
+    offset = 0
+    for count, _, label in tiny["pieces"]:
+        layout.append({"from": label, "start": offset, "end": offset + count})
+        offset += count
+
+    source_bytes = sum(_nbytes(t) for t in inputs)
+    prep_bytes = _allocated(trimmed, inputs)
+    mask_bytes = sum(_allocated(t, [trimmed]) for t in (control_frames, mask, latent_mask))
+    vace_bytes = _nbytes(vace_output)
+    merge_bytes = _allocated(merged, inputs + [vace_output])
+    return {
+        "mode": mode,
+        "source": {
+            "frames": frames, "height": height, "width": width, "channels": channels,
+            "dtype": source_dtype, "bytes": source_bytes,
+        },
+        "source_prep": {
+            "trimmed_frames": trimmed.shape[0],
+            "trim_start": pipe["trim_start"], "trim_end": pipe["trim_end"],
+            "left_ctx": pipe["left_ctx"], "right_ctx": pipe["right_ctx"],
+            "split_index": out_split, "edge_frames": out_edge,
+            "output_bytes": _nbytes(trimmed), "allocated_bytes": prep_bytes,
+        },
+        "mask_generator": {
+            "target_frames": target,
+            "kept_frames": kept,
+            "generated_frames": len(values) - kept,
+            "layout": runs,
+            "control_frames_bytes": _nbytes(control_frames),
+            "mask_bytes": _nbytes(mask),
+            "latent_mask_shape": list(latent_mask.shape),
+            "latent_mask_bytes": _nbytes(latent_mask),
+            "allocated_bytes": mask_bytes,
+        },
+        "sampler": {
+            "frames": control_frames.shape[0],
+            "latent_frames": latent_mask.shape[0],
+            "output_bytes": vace_bytes,
+        },
+        "merge_back": {
+            "output_frames": merged.shape[0],
+            "layout": layout,
+            "output_bytes": _nbytes(merged),
+            "allocated_bytes": merge_bytes,
+        },
+        # Everything a ComfyUI run keeps cached at once: source, each node's own allocations, sampler output
+        "peak_bytes": source_bytes + prep_bytes + mask_bytes + vace_bytes + merge_bytes,
+    }
+
+
+class VACEPlan:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "plan"
+    RETURN_TYPES = ("STRING", "INT", "INT", "INT")
+    RETURN_NAMES = ("plan_json", "target_frames", "trimmed_frames", "generated_frames")
+    OUTPUT_TOOLTIPS = (
+        "JSON plan: trim bounds, mask layout, merge layout, and byte estimates per node.",
+        "target_frames the mask generator will produce (4n+1).",
+        "Frames VACE Source Prep keeps.",
+        "Frames the sampler has to generate (white in the mask).",
+    )
+    DESCRIPTION = """VACE Plan — dry-runs a VACE job from its settings, without any frames.
+
+Runs the same VACE Source Prep, VACE Mask Generator and VACE Merge Back logic on shape-only
+inputs and reports what a real run would produce: trimmed length and trim bounds, target_frames,
+kept vs. generated frames, the mask and merge layouts, and how many bytes each node allocates.
+peak_bytes adds up everything a ComfyUI run holds at once (source, node outputs, sampler output).
+
+Video Inpaint is planned with an all-white mask and no crop. Optical flow blending allocates
+the same outputs as alpha, so it is planned as alpha."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "frames": ("INT", {"default": 81, "min": 1, "max": 1000000, "description": "Frames in the full source video."}),
+                "width": ("INT", {"default": 832, "min": 1, "max": 16384, "description": "Source frame width."}),
+                "height": ("INT", {"default": 480, "min": 1, "max": 16384, "description": "Source frame height."}),
+                "mode": (VACE_MODES, {"default": "End Extend", "description": "Generation mode."}),
+                "split_index": ("INT", {"default": 0, "min": -10000, "max": 10000, "description": "As on VACE Source Prep."}),
+                "input_left": ("INT", {"default": 0, "min": 0, "max": 10000, "description": "As on VACE Source Prep."}),
+                "input_right": ("INT", {"default": 0, "min": 0, "max": 10000, "description": "As on VACE Source Prep."}),
+                "edge_frames": ("INT", {"default": 8, "min": 1, "max": 10000, "description": "As on VACE Source Prep."}),
+                "target_frames": ("INT", {"default": 81, "min": 1, "max": 10000, "description": "As on VACE Mask Generator."}),
+            },
+            "optional": {
+                "source_dtype": (["fp32", "fp16", "bf16"], {"default": "fp32", "description": "Dtype of the source frames."}),
+                "second_frames": ("INT", {"default": 0, "min": 0, "max": 1000000, "description": "Join Extend: frames in source_clip_2 (0 = one-clip join)."}),
+                "keyframe_positions": ("STRING", {"default": "", "description": "Keyframe / Upscale positions, as on VACE Source Prep."}),
+                "blend_method": (["optical_flow", "alpha", "none"], {"default": "optical_flow", "description": "Merge blend method."}),
+                "mask_format": (["full", "broadcast"], {"default": "full", "description": "As on VACE Mask Generator."}),
+                "mask_dtype": (["fp32", "fp16", "bf16", "same"], {"default": "fp32", "description": "VACE Mask Generator output_dtype."}),
+            },
+        }
+
+    def plan(self, frames, width, height, mode, split_index, input_left, input_right, edge_frames, target_frames,
+             source_dtype="fp32", second_frames=0, keyframe_positions="", blend_method="optical_flow", mask_format="full",
+             mask_dtype="fp32"):
+        plan = vace_plan(
+            frames, height, width, mode, split_index, input_left, input_right, edge_frames, target_frames,
+            source_dtype=source_dtype, second_frames=second_frames, keyframe_positions=keyframe_positions,
+            blend_method=blend_method, mask_format=mask_format, mask_dtype=mask_dtype,
+        )
+        return (
+            json.dumps(plan, indent=2),
+            plan["mask_generator"]["target_frames"],
+            plan["source_prep"]["trimmed_frames"],
+            plan["mask_generator"]["generated_frames"],
+        )
+
+
+CONTEXT_MODES = ["End Extend", "Pre Extend", "Middle Extend", "Edge Extend", "Join Extend", "Bidirectional Extend", "Replace/Inpaint"]
+
+
+def auto_context(mode, frames, min_context, min_generate, split_index=0, edge_frames=8, frames_2=0):
+    """Smallest input_left / input_right / target_frames meeting min_context and min_generate.
+
+    Each side keeps min_context frames (or all that are available), and target_frames is the
+    first 4n+1 length that fits them plus min_generate, so the snap to 4n+1 adds generated
+    frames instead of padding. Replace/Inpaint generates edge_frames in place; there the
+    contexts absorb the padding instead. Also returns the naive settings (input_left /
+    input_right = 0, Source Prep's defaults) for comparison. Returns a dict.
+    """
+    left = right = 0
+    if mode in ("End Extend", "Bidirectional Extend"):
+        left = min(min_context, frames)
+        kept, naive_kept = left, frames
+    elif mode == "Pre Extend":
+        right = min(min_context, frames)
+        kept, naive_kept = right, frames
+    elif mode == "Middle Extend":
+        split = split_index if split_index > 0 else frames // 2
+        if split >= frames:
+            raise ValueError(
+                f"Middle Extend: split_index ({split_index}) is out of range — "
+                f"source_clip only has {frames} frames. Use 0 for auto-middle."
+            )
+        left, right = min(min_context, split), min(min_context, frames - split)
+        kept, naive_kept = left + right, frames
+    elif mode in ("Edge Extend", "Join Extend"):
+        # With input_left / input_right = 0, Source Prep keeps edge_frames per side
+        if mode == "Edge Extend":
+            avail = frames
+        elif frames_2 > 0:
+            avail = min(frames, frames_2)
+        else:
+            avail = min(frames // 2, frames - frames // 2)
+        left = right = min(min_context, avail)
+        kept, naive_kept = 2 * left, 2 * min(edge_frames, avail)
+    elif mode == "Replace/Inpaint":
+        if split_index >= frames:
+            raise ValueError(
+                f"Replace/Inpaint: split_index ({split_index}) is out of range — "
+                f"source_clip only has {frames} frames."
+            )
+        start = max(0, min(split_index, frames))
+        length = max(0, min(edge_frames, frames - start))
+        avail_left, avail_right = start, frames - start - length
+        left, right = min(min_context, avail_left), min(min_context, avail_right)
+        # Pad the contexts (right first) up to the sampler's 4n+1 length
+        slack = _snap_4n1(left + length + right) - (left + length + right)
+        grow = min(slack, avail_right - right)
+        right += grow
+        left += min(slack - grow, avail_left - left)
+        target = _snap_4n1(left + length + right)
+        naive_target = _snap_4n1(frames)
+        return {"mode": mode, "input_left": left, "input_right": right, "target_frames": target,
+                "generated_frames": length, "naive_target_frames": naive_target, "frames_saved": naive_target - target}
+    else:
+        raise ValueError(f"Auto context: {mode} does not trim context (supported: {', '.join(CONTEXT_MODES)}).")
+    target = _snap_4n1(kept + min_generate)
+    naive_target = _snap_4n1(naive_kept + min_generate)
+    return {"mode": mode, "input_left": left, "input_right": right, "target_frames": target,
+            "generated_frames": target - kept, "naive_target_frames": naive_target, "frames_saved": naive_target - target}
+
+
+class VACEAutoContext:
+    CATEGORY = "VACE Tools"
+    FUNCTION = "compute"
+    RETURN_TYPES = ("INT", "INT", "INT", "INT", "STRING")
+    RETURN_NAMES = ("input_left", "input_right", "target_frames", "frames_saved", "report")
+    OUTPUT_TOOLTIPS = (
+        "Context before the generated span — wire to VACE Source Prep's input_left.",
+        "Context after the generated span — wire to VACE Source Prep's input_right.",
+        "Smallest 4n+1 sampler length — wire to VACE Mask Generator's target_frames.",
+        "Sampler frames saved compared to Source Prep's defaults (input_left = input_right = 0). Negative when min_context asks for more than the default keeps: Edge and Join Extend keep edge_frames per side by default, so min_context > edge_frames costs frames.",
+        "One-line summary of the chosen settings.",
+    )
+    DESCRIPTION = """VACE Auto Context — picks the smallest context and target_frames for a job.
+
+With input_left / input_right = 0, VACE Source Prep keeps all available context (edge_frames
+per side for Edge and Join Extend), and the mask generator then rounds target_frames up to 4n+1. Sampler cost grows with frame count, so this
+node works out the minimal settings instead: min_context frames of context per side (or all
+that exist), and the first 4n+1 target_frames that also fits min_generate new frames. The
+rounding goes into generated frames rather than padding.
+
+Replace/Inpaint always generates edge_frames in place; there the contexts are padded to the
+next 4n+1 length instead.
+
+Supported modes: End, Pre, Middle, Edge, Join, Bidirectional Extend and Replace/Inpaint."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "mode": (CONTEXT_MODES, {"default": "End Extend", "description": "Generation mode — must match VACE Source Prep."}),
+                "min_context": ("INT", {"default": 8, "min": 1, "max": 10000, "description": "Minimum context frames per side."}),
+                "min_generate": ("INT", {"default": 32, "min": 0, "max": 10000, "description": "Minimum new frames to generate (ignored by Replace/Inpaint, which generates edge_frames)."}),
+                "split_index": ("INT", {"default": 0, "min": -10000, "max": 10000, "description": "As on VACE Source Prep."}),
+                "edge_frames": ("INT", {"default": 8, "min": 1, "max": 10000, "description": "As on VACE Source Prep."}),
+            },
+            "optional": {
+                "source_clip": ("IMAGE", {"description": "Full source video — only its frame count is used."}),
+                "source_clip_2": ("IMAGE", {"description": "Join Extend: second clip — only its frame count is used."}),
+                "frame_count": ("INT", {"default": 0, "min": 0, "max": 1000000, "description": "Source frame count when source_clip is not connected (e.g. from VACE Frame Source)."}),
+            },
+        }
+
+    def compute(self, mode, min_context, min_generate, split_index, edge_frames, source_clip=None, source_clip_2=None, frame_count=0):
+        frames = source_clip.shape[0] if source_clip is not None else frame_count
+        if frames <= 0:
+            raise ValueError("VACE Auto Context: connect source_clip or set frame_count.")
+        frames_2 = source_clip_2.shape[0] if source_clip_2 is not None else 0
+        plan = auto_context(mode, frames, min_context, min_generate, split_index, edge_frames, frames_2)
+        saved = plan["frames_saved"]
+        report = (
+            f"{mode}: context {plan['input_left']}/{plan['input_right']}, {plan['generated_frames']} generated, "
+            f"target_frames {plan['target_frames']} (defaults: {plan['naive_target_frames']}, "
+            f"saves {saved} frames / {100 * saved / max(plan['naive_target_frames'], 1):.0f}%)"
+        )
+        return (plan["input_left"], plan["input_right"], plan["target_frames"], saved, report)
+
+
+NODE_CLASS_MAPPINGS = {
+    "VACEPlan": VACEPlan,
+    "VACEAutoContext": VACEAutoContext,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "VACEPlan": "VACE Plan",
+    "VACEAutoContext": "VACE Auto Context",
+}
@@ -1,13 +1,458 @@
 import os
 import json
+import hashlib
 import logging
+import queue
+import re
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 import torch
 import folder_paths
-from safetensors.torch import save_file
+from safetensors import safe_open
 from comfy.utils import ProgressBar, load_torch_file
 
+try:
+    from comfy.weight_adapter import LoRAAdapter
+except ImportError:  # ComfyUI before weight adapters: LoRA patches are plain tuples
+    LoRAAdapter = None
+
 log = logging.getLogger("ComfyUI-WanVideoSaveMerged")
 
+SAFETENSORS_DTYPES = {
+    torch.float64: "F64",
+    torch.float32: "F32",
+    torch.float16: "F16",
+    torch.bfloat16: "BF16",
+    torch.int64: "I64",
+    torch.int32: "I32",
+    torch.int16: "I16",
+    torch.int8: "I8",
+    torch.uint8: "U8",
+    torch.bool: "BOOL",
+    torch.float8_e4m3fn: "F8_E4M3",
+    torch.float8_e5m2: "F8_E5M2",
+}
+
+
+def _safetensors_header(entries, metadata=None, keep_order=False):
+    """Build a safetensors header for (key, dtype, shape) entries.
+
+    Entries are laid out like safetensors' own serializer (widest dtype first, then by key), so
+    every tensor stays aligned to its element size. keep_order=True writes them in the given
+    order instead; the caller is then responsible for alignment. Returns (header bytes,
+    [(key, begin, end)]).
+    """
+    order = list(entries) if keep_order else sorted(entries, key=lambda e: (-e[1].itemsize, e[0]))
+    header = {}
+    if metadata:
+        header["__metadata__"] = {str(k): str(v) for k, v in metadata.items()}
+    layout, offset = [], 0
+    for key, dtype, shape in order:
+        size = dtype.itemsize
+        for dim in shape:
+            size *= dim
+        header[key] = {"dtype": SAFETENSORS_DTYPES[dtype], "shape": list(shape), "data_offsets": [offset, offset + size]}
+        layout.append((key, offset, offset + size))
+        offset += size
+    data = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data += b" " * (-len(data) % 8)
+    return len(data).to_bytes(8, "little") + data, layout
+
+
+def _prefetch(keys, produce, depth):
+    """Yield (key, produce(key)) for keys in order, computing up to depth tensors ahead.
+
+    With depth > 0 a worker thread runs produce and hands results over through a bounded queue,
+    so producing the next tensor overlaps with writing the current one; about depth + 2 tensors
+    are alive at once. depth = 0 produces each tensor on demand.
+    """
+    if depth <= 0:
+        for key in keys:
+            yield key, produce(key)
+        return
+
+    results = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def work():
+        try:
+            for key in keys:
+                if not put((key, produce(key), None)):
+                    return
+        except BaseException as e:
+            put((key, None, e))
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    try:
+        for _ in keys:
+            key, tensor, error = results.get()
+            if error is not None:
+                raise error
+            yield key, tensor
+            del tensor
+    finally:
+        stop.set()
+        worker.join()
+
+
+def _write_safetensors(path, entries, produce, metadata=None, on_tensor=None, prefetch=0, keep_order=False):
+    """Stream tensors into a safetensors file, one at a time.
+
+    entries lists (key, dtype, shape) up front so the header can be written first; produce(key)
+    then returns each tensor in that dtype and shape. Only one converted tensor is alive at a
+    time (plus up to prefetch tensors produced ahead, see _prefetch), and aliased tensors
+    (shared storage) are simply written twice, so nothing is cloned. The file is written under
+    a temporary name and renamed when complete.
+    """
+    header, layout = _safetensors_header(entries, metadata, keep_order)
+    expected = {key: (dtype, tuple(shape)) for key, dtype, shape in entries}
+    tmp_path = path + ".tmp"
+    tensors = _prefetch([key for key, begin, end in layout], produce, prefetch)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for key, tensor in tensors:
+                if (tensor.dtype, tuple(tensor.shape)) != expected[key]:
+                    raise RuntimeError(
+                        f"Tensor '{key}' changed to {tensor.dtype} {tuple(tensor.shape)} while saving "
+                        f"(expected {expected[key][0]} {expected[key][1]})."
+                    )
+                data = tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8)
+                f.write(data.numpy().data)
+                del tensor, data
+                if on_tensor is not None:
+                    on_tensor(key)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        tensors.close()
+
+
+def _shard_entries(entries, max_shard_bytes):
+    """Split (key, dtype, shape) entries into consecutive shards of at most max_shard_bytes.
+
+    Like transformers' sharding, a tensor larger than the limit gets a shard of its own.
+    max_shard_bytes <= 0 keeps everything in one shard.
+    """
+    shards, current, current_bytes = [], [], 0
+    for entry in entries:
+        size = entry[1].itemsize
+        for dim in entry[2]:
+            size *= dim
+        if max_shard_bytes > 0 and current and current_bytes + size > max_shard_bytes:
+            shards.append(current)
+            current, current_bytes = [], 0
+        current.append(entry)
+        current_bytes += size
+    if current or not shards:
+        shards.append(current)
+    return shards
+
+
+def _stem_files(output_dir, stem):
+    """Existing files in output_dir that a save under stem would write: the single file, the
+    index, the delta, or any {stem}-NNNNN-of-NNNNN shard (whatever its shard count)."""
+    pattern = re.compile(re.escape(stem) + r"(\.safetensors|\.safetensors\.index\.json|\.delta\.safetensors|-\d{5}-of-\d{5}\.safetensors)")
+    try:
+        names = os.listdir(output_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if pattern.fullmatch(name))
+
+
+def _save_sharded(output_dir, stem, entries, produce, metadata=None, max_shard_bytes=0, workers=1, on_tensor=None, prefetch=0,
+                  keep_order=False):
+    """Write entries as {stem}.safetensors, or as shards plus an index when they exceed max_shard_bytes.
+
+    Shards are named {stem}-00001-of-0000N.safetensors and listed in {stem}.safetensors.index.json
+    ({"metadata": {"total_size": ...}, "weight_map": {key: shard}}), the layout transformers and
+    diffusers load. Each shard is written by its own worker thread. Returns the written filenames,
+    index first.
+
+    Refuses to run when files of an earlier save under stem exist, so a loader never picks up
+    stale shards next to new ones. On failure only the files this call wrote are removed.
+    """
+    existing = _stem_files(output_dir, stem)
+    if existing:
+        raise FileExistsError(f"'{output_dir}' already holds files for '{stem}': {', '.join(existing)}")
+    shards = _shard_entries(entries, max_shard_bytes)
+    if len(shards) == 1:
+        names = [f"{stem}.safetensors"]
+    else:
+        names = [f"{stem}-{i + 1:05d}-of-{len(shards):05d}.safetensors" for i in range(len(shards))]
+
+    lock = threading.Lock()
+    written = []
+
+    def done(key):
+        if on_tensor is not None:
+            with lock:
+                on_tensor(key)
+
+    def write(i):
+        path = os.path.join(output_dir, names[i])
+        _write_safetensors(path, shards[i], produce, metadata, done, prefetch, keep_order)
+        with lock:
+            written.append(path)
+
+    try:
+        with ThreadPoolExecutor(max(1, min(workers, len(shards)))) as pool:
+            for future in [pool.submit(write, i) for i in range(len(shards))]:
+                future.result()
+    except BaseException:
+        for path in written:
+            os.remove(path)
+        raise
+    if len(shards) == 1:
+        return names
+
+    total_size = 0
+    weight_map = {}
+    for name, shard in zip(names, shards):
+        for key, dtype, shape in shard:
+            size = dtype.itemsize
+            for dim in shape:
+                size *= dim
+            total_size += size
+            weight_map[key] = name
+    index_name = f"{stem}.safetensors.index.json"
+    index = {"metadata": dict(metadata or {}, total_size=total_size), "weight_map": dict(sorted(weight_map.items()))}
+    with open(os.path.join(output_dir, index_name), "w") as f:
+        json.dump(index, f, indent=2)
+    return [index_name] + names
+
+
+FP8_DTYPES = {
+    "fp8_e4m3fn": torch.float8_e4m3fn,
+    "fp8_e5m2": torch.float8_e5m2,
+}
+FP8_SKIP_DEFAULT = "norm, embedding, time_projection, head, modulation, img_emb"
+
+
+def _fp8_scale(weight, fp8_dtype, per_channel=False):
+    """float32 scale mapping weight's absolute max (per tensor, or per output channel) onto fp8_dtype's range."""
+    weight = weight.float()
+    if per_channel:
+        amax = weight.abs().reshape(weight.shape[0], -1).amax(dim=1).reshape((-1,) + (1,) * (weight.ndim - 1))
+    else:
+        amax = weight.abs().amax()
+    return (amax / torch.finfo(fp8_dtype).max).clamp(min=torch.finfo(torch.float32).tiny).cpu()
+
+
+def _fp8_quantize(weight, scale, fp8_dtype):
+    """weight / scale, saturated to fp8_dtype's range and cast to it."""
+    limit = torch.finfo(fp8_dtype).max
+    return (weight.float() / scale.to(weight.device)).clamp(-limit, limit).to(fp8_dtype)
+
+
+DELTA_FORMATS = ("delta_lowrank", "delta_lossless")
+DELTA_SUFFIXES = (".__delta_up__", ".__delta_down__")
+DELTA_TOLERANCE = 1e-2
+_SHA256_CACHE = {}
+
+
+def _find_checkpoint(pipeline, model_name):
+    """Path of the checkpoint the pipeline was loaded from, or None."""
+    base_path = pipeline.get("base_path") or ""
+    if base_path and os.path.exists(base_path):
+        return base_path
+    # Search ComfyUI model directories
+    name = str(model_name)
+    for folder_type in ("diffusion_models", "unet", "checkpoints"):
+        try:
+            base_path = folder_paths.get_full_path(folder_type, name)
+        except Exception:
+            base_path = None
+        if base_path and os.path.exists(base_path):
+            return base_path
+    return None
+
+
+def _file_sha256(path):
+    """sha256 of a file, cached per (path, size, mtime) for the life of the process."""
+    stat = os.stat(path)
+    cache_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    if cache_key not in _SHA256_CACHE:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(64 * 1024 * 1024), b""):
+                digest.update(block)
+        _SHA256_CACHE[cache_key] = digest.hexdigest()
+    return _SHA256_CACHE[cache_key]
+
+
+def _low_rank(diff, max_rank, dtype, tolerance=DELTA_TOLERANCE):
+    """Factor a 2-D diff as up @ down with rank <= max_rank, or None if that does not fit.
+
+    Uses a randomized SVD and keeps the smallest rank whose factors, stored in dtype, reproduce
+    diff to within tolerance (relative Frobenius error). LoRA merges produce diffs of exactly
+    the LoRA rank, so this recovers compact factors without parsing the patch format.
+    """
+    m, n = diff.shape
+    q = min(max_rank, m, n)
+    norm = diff.norm()
+    if q * (m + n) >= m * n or norm == 0:
+        return None
+    u, sv, v = torch.svd_lowrank(diff, q=min(q + 8, m, n), niter=2)
+    residual = (norm ** 2 - torch.cumsum(sv ** 2, 0)).clamp(min=0).sqrt() / norm
+    fits = (residual[:q] <= tolerance / 2).nonzero()
+    rank = int(fits[0]) + 1 if len(fits) else q
+    root = sv[:rank].sqrt()
+    up = (u[:, :rank] * root).to(dtype)
+    down = (root[:, None] * v[:, :rank].T).to(dtype)
+    if (diff - up.float() @ down.float()).norm() / norm > tolerance:
+        return None
+    return up, down
+
+
+def _save_delta(path, tensors, patched, target_dtype, base_path, metadata, max_rank=0, on_tensor=None, prefetch=0):
+    """Write only what differs from the base checkpoint at base_path. Returns per-kind key counts.
+
+    Each tensor is compared with the base (memory-mapped) after patching and casting. Unchanged
+    tensors are stored as a reference only, and everything else (changed weights, VACE weights
+    missing from the base) in full, so the delta is lossless. With max_rank > 0, changed 2-D
+    tensors are stored as low-rank factors instead where _low_rank fits; that is lossy, up to
+    DELTA_TOLERANCE of each diff. References and factor dtypes are listed in the "delta_map"
+    metadata entry.
+    """
+    delta_map, factors, full = {}, {}, []
+    with safe_open(base_path, framework="pt", device="cpu") as base:
+        base_keys = set(base.keys())
+        for key, source in tensors.items():
+            dtype = target_dtype or source.dtype
+            if key in base_keys and tuple(base.get_slice(key).get_shape()) == tuple(source.shape):
+                weight = patched(key).cpu()
+                base_weight = base.get_tensor(key)
+                if torch.equal(weight.to(dtype), base_weight.to(dtype)):
+                    delta_map[key] = ["base", SAFETENSORS_DTYPES[dtype]]
+                elif max_rank > 0 and weight.ndim == 2 and weight.is_floating_point():
+                    factor_dtype = dtype if dtype in (torch.float32, torch.float16, torch.bfloat16) else torch.bfloat16
+                    pair = _low_rank(weight.float() - base_weight.float(), max_rank, factor_dtype)
+                    if pair is not None:
+                        delta_map[key] = ["lowrank", SAFETENSORS_DTYPES[dtype]]
+                        factors[key + DELTA_SUFFIXES[0]], factors[key + DELTA_SUFFIXES[1]] = pair
+                    else:
+                        full.append(key)
+                else:
+                    full.append(key)
+                del weight, base_weight
+            else:
+                full.append(key)
+            if on_tensor is not None:
+                on_tensor(key)
+
+    metadata = dict(metadata or {})
+    metadata.update({
+        "format": "wanvideo_delta",
+        "delta_base": os.path.basename(base_path),
+        "delta_base_path": os.path.abspath(base_path),
+        "delta_base_size": str(os.path.getsize(base_path)),
+        "delta_base_sha256": _file_sha256(base_path),
+        "delta_map": json.dumps(delta_map),
+    })
+
+    def produce(key):
+        if key in factors:
+            return factors.pop(key)
+        source = tensors[key]
+        return patched(key).cpu().to(target_dtype or source.dtype)
+
+    entries = [(k, target_dtype or tensors[k].dtype, tuple(tensors[k].shape)) for k in full]
+    entries += [(k, f.dtype, tuple(f.shape)) for k, f in factors.items()]
+    _write_safetensors(path, entries, produce, metadata, prefetch=prefetch)
+    kinds = [kind for kind, _ in delta_map.values()]
+    return {"base": kinds.count("base"), "lowrank": kinds.count("lowrank"), "full": len(full)}
+
+
+class DeltaStateDict(Mapping):
+    """Read-only state dict over a delta save, reconstructing each tensor on access.
+
+    The base checkpoint and the delta file are memory-mapped; indexing a key reads its base
+    tensor and adds the stored low-rank diff, if any. patches() gives the same overlay as
+    ComfyUI model patches instead. base_path overrides the path recorded in the delta. The
+    base is checked by size, or by sha256 with verify_base.
+    """
+
+    def __init__(self, path, base_path="", verify_base=False):
+        self.path = path
+        self._delta = safe_open(path, framework="pt", device="cpu")
+        self.metadata = self._delta.metadata() or {}
+        if self.metadata.get("format") != "wanvideo_delta":
+            raise ValueError(f"'{path}' is not a WanVideo delta save.")
+        base_path = base_path or self.metadata["delta_base_path"]
+        if not os.path.exists(base_path):
+            found = _find_checkpoint({}, self.metadata["delta_base"])
+            if found is None:
+                raise FileNotFoundError(
+                    f"Base checkpoint '{self.metadata['delta_base']}' of delta '{path}' not found. Set base_path."
+                )
+            base_path = found
+        if os.path.getsize(base_path) != int(self.metadata["delta_base_size"]) or (
+            verify_base and _file_sha256(base_path) != self.metadata["delta_base_sha256"]
+        ):
+            raise ValueError(f"Base checkpoint '{base_path}' does not match the one delta '{path}' was saved against.")
+        self.base_path = base_path
+        self._base = safe_open(base_path, framework="pt", device="cpu")
+        dtypes = {name: dtype for dtype, name in SAFETENSORS_DTYPES.items()}
+        self._map = {k: (kind, dtypes[dtype]) for k, (kind, dtype) in json.loads(self.metadata["delta_map"]).items()}
+        self._full = {k for k in self._delta.keys() if not k.endswith(DELTA_SUFFIXES)}
+        self._keys = list(self._map) + sorted(self._full)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._map or key in self._full
+
+    def __getitem__(self, key):
+        if key in self._full:
+            return self._delta.get_tensor(key)
+        if key not in self._map:
+            raise KeyError(key)
+        kind, dtype = self._map[key]
+        weight = self._base.get_tensor(key)
+        if kind == "lowrank":
+            up = self._delta.get_tensor(key + DELTA_SUFFIXES[0]).float()
+            down = self._delta.get_tensor(key + DELTA_SUFFIXES[1]).float()
+            weight = weight.float().addmm_(up, down)
+        return weight.to(dtype)
+
+    def patches(self):
+        """{key: patch} turning the base model into the saved one, for ModelPatcher.add_patches.
+
+        Tensors stored in full become "set" patches (read into memory here); low-rank diffs
+        become LoRA patches, multiplied out only when ComfyUI patches that weight. Tensors the
+        delta references from the base need no patch.
+        """
+        patches = {key: ("set", (self._delta.get_tensor(key),)) for key in self._full}
+        for key, (kind, _) in self._map.items():
+            if kind == "lowrank":
+                up = self._delta.get_tensor(key + DELTA_SUFFIXES[0])
+                down = self._delta.get_tensor(key + DELTA_SUFFIXES[1])
+                if LoRAAdapter is not None:
+                    patches[key] = LoRAAdapter(set(), (up, down, None, None, None, None))
+                else:
+                    patches[key] = ("lora", (up, down, None, None, None))
+        return patches
+
 
 class WanVideoSaveMergedModel:
     @classmethod
@@ -18,14 +463,44 @@ class WanVideoSaveMergedModel:
                 "filename_prefix": ("STRING", {"default": "merged_wanvideo", "tooltip": "Filename prefix for the saved model"}),
             },
             "optional": {
-                "save_dtype": (["same", "bf16", "fp16", "fp32"], {
+                "save_dtype": (["same", "bf16", "fp16", "fp32", "fp8_e4m3fn", "fp8_e5m2"], {
                     "default": "same",
-                    "tooltip": "Cast weights to this dtype before saving. 'same' keeps the current dtype of each tensor. Recommended to set explicitly if model was loaded in fp8."
+                    "tooltip": "Cast weights to this dtype before saving. 'same' keeps the current dtype of each tensor. Recommended to set explicitly if model was loaded in fp8. The fp8 options store scaled fp8 weights with a float32 <layer>.scale_weight each (ComfyUI's scaled fp8 layout); layers matching fp8_skip keep their dtype."
                 }),
                 "custom_path": ("STRING", {
                     "default": "",
                     "tooltip": "Absolute path to save directory. Leave empty to save in ComfyUI/models/diffusion_models/"
                 }),
+                "max_shard_gb": ("FLOAT", {
+                    "default": 0.0, "min": 0.0, "max": 1024.0, "step": 0.5,
+                    "tooltip": "Split the model into shards of at most this many GB, with a <prefix>.safetensors.index.json weight map (Hugging Face layout). 0 = single file."
+                }),
+                "workers": ("INT", {
+                    "default": 4, "min": 1, "max": 64,
+                    "tooltip": "Shards converted and written in parallel, one per thread. Each worker holds about one tensor in memory."
+                }),
+                "fp8_scaling": (["per_tensor", "per_channel"], {
+                    "default": "per_tensor",
+                    "tooltip": "fp8 save: one scale per weight, or one per output channel (more accurate, but loaders using torch._scaled_mm need per_tensor)."
+                }),
+                "fp8_skip": ("STRING", {
+                    "default": FP8_SKIP_DEFAULT,
+                    "tooltip": "fp8 save: comma-separated key substrings of weights kept in their own dtype instead of fp8. 1-D tensors (biases, norm scales) are never quantized."
+                }),
+                "save_format": (["full", *DELTA_FORMATS], {
+                    "default": "full",
+                    "tooltip": "Delta formats write only what differs from the checkpoint the model was loaded from (<prefix>.delta.safetensors); apply one to that checkpoint with WanVideo Load Delta Model. "
+                               "delta_lowrank stores each LoRA-patched 2-D weight as low-rank factors (compact, lossy: see delta_rank). "
+                               "delta_lossless stores every changed weight in full, so it is bit-exact but about the size of the patched layers."
+                }),
+                "delta_rank": ("INT", {
+                    "default": 64, "min": 1, "max": 1024,
+                    "tooltip": "delta_lowrank: highest rank kept per weight. Each diff is reproduced to within 1% of the diff itself (relative Frobenius error), not of the weight. Diffs needing a higher rank, and patched non-2-D weights, are stored in full."
+                }),
+                "prefetch": ("INT", {
+                    "default": 0, "min": 0, "max": 8,
+                    "tooltip": "Tensors patched and cast ahead of the writer on a background thread, overlapping LoRA patching with disk I/O. Each adds about one tensor of memory per worker. 0 = patch each tensor just before writing it."
+                }),
             },
         }
 
@@ -35,7 +510,8 @@ class WanVideoSaveMergedModel:
     OUTPUT_NODE = True
     DESCRIPTION = "Saves the WanVideo diffusion model (including merged LoRAs) as a safetensors file"
 
-    def save_model(self, model, filename_prefix, save_dtype="same", custom_path=""):
+    def save_model(self, model, filename_prefix, save_dtype="same", custom_path="", max_shard_gb=0.0, workers=4,
+                   fp8_scaling="per_tensor", fp8_skip=FP8_SKIP_DEFAULT, save_format="full", delta_rank=64, prefetch=0):
         dtype_map = {
             "bf16": torch.bfloat16,
             "fp16": torch.float16,
@@ -49,14 +525,13 @@ class WanVideoSaveMergedModel:
             output_dir = os.path.join(folder_paths.models_dir, "diffusion_models")
         os.makedirs(output_dir, exist_ok=True)
 
-        # Build filename, avoid overwriting
-        filename = f"{filename_prefix}.safetensors"
-        output_path = os.path.join(output_dir, filename)
+        # Build filename, avoid overwriting (a sharded save is named after its index file)
+        stem = filename_prefix
         counter = 1
-        while os.path.exists(output_path):
-            filename = f"{filename_prefix}_{counter}.safetensors"
-            output_path = os.path.join(output_dir, filename)
+        while _stem_files(output_dir, stem):
+            stem = f"{filename_prefix}_{counter}"
             counter += 1
+        output_path = os.path.join(output_dir, f"{stem}.safetensors")
 
         # Gather metadata about the merge for traceability
         metadata = {}
@@ -72,6 +547,12 @@ class WanVideoSaveMergedModel:
                 })
             metadata["merged_loras"] = json.dumps(lora_entries)
         metadata["save_dtype"] = save_dtype
+        fp8_dtype = FP8_DTYPES.get(save_dtype)
+        if fp8_dtype is not None:
+            if save_format in DELTA_FORMATS:
+                raise ValueError("fp8 save_dtype is not supported with the delta save formats.")
+            metadata["fp8_scaling"] = fp8_scaling
+            metadata["fp8_skip"] = fp8_skip
 
         # Extract state dict from the diffusion model.
         # WanVideo wrapper initializes models on meta device (shape-only, no data)
@@ -109,19 +590,7 @@ class WanVideoSaveMergedModel:
 
         # Source 3: reload from checkpoint file on disk
         if state_dict is None:
-            base_path = pipeline.get("base_path") or ""
-            if not base_path or not os.path.exists(base_path):
-                # Search ComfyUI model directories
-                name = str(model_name)
-                for folder_type in ("diffusion_models", "unet", "checkpoints"):
-                    try:
-                        base_path = folder_paths.get_full_path(folder_type, name)
-                    except Exception:
-                        base_path = None
-                    if base_path and os.path.exists(base_path):
-                        break
-                    base_path = None
-
+            base_path = _find_checkpoint(pipeline, model_name)
             if not base_path:
                 raise RuntimeError(
                     f"Model weights are on meta device and cannot find checkpoint file "
@@ -133,36 +602,165 @@ class WanVideoSaveMergedModel:
                         "For full merged save, ensure the model loader keeps pipeline['sd'].")
             state_dict = load_torch_file(base_path, device="cpu")
 
-        # Apply any LoRA patches from the model patcher
-        if hasattr(model, "patches") and model.patches:
-            log.info(f"Applying {len(model.patches)} LoRA patches...")
-            for key, patches in model.patches.items():
-                if key in state_dict:
-                    state_dict[key] = model.calculate_weight(patches, state_dict[key], key)
-
+        # LoRA patches from the model patcher are applied per tensor as it is written,
+        # so only the tensor being saved is ever materialized in patched form
+        patches = getattr(model, "patches", None) or {}
+        patched = sum(1 for key in patches if key in state_dict)
+        if patched:
+            log.info(f"Applying {patched} LoRA patches while saving...")
 
         target_dtype = dtype_map.get(save_dtype)
         pbar = ProgressBar(len(state_dict))
 
-        clean_sd = {}
-        for k, v in state_dict.items():
-            tensor = v.cpu()
-            if target_dtype is not None:
-                tensor = tensor.to(target_dtype)
-            # Clone to break shared memory between aliased tensors
-            # (e.g. patch_embedding / expanded_patch_embedding / original_patch_embedding)
-            # safetensors save_file doesn't handle shared tensors, and save_model
-            # deduplicates keys which breaks compatibility with ComfyUI's load_file
-            clean_sd[k] = tensor.clone()
-            pbar.update(1)
+        # Aliased tensors (e.g. patch_embedding / expanded_patch_embedding /
+        # original_patch_embedding) share storage. Each key is still written as its own
+        # entry, which keeps the file loadable by ComfyUI's load_file without cloning.
+        tensors = {k: v for k, v in state_dict.items() if isinstance(v, torch.Tensor)}
+        storages = {}
+        for k, v in tensors.items():
+            if v.device.type != "meta":
+                storages.setdefault((v.device, v.untyped_storage().data_ptr()), []).append(k)
+        aliased = [keys for keys in storages.values() if len(keys) > 1]
+        if aliased:
+            log.info(f"Writing {sum(len(keys) for keys in aliased)} aliased tensors as separate entries: "
+                     + "; ".join(", ".join(keys) for keys in aliased))
+
+        def patched(key):
+            tensor = tensors[key]
+            if key in patches:
+                # calculate_weight may update its input in place, so patch an fp32 copy
+                # (as ModelPatcher does) and leave the source state dict untouched
+                tensor = model.calculate_weight(patches[key], tensor.to(torch.float32, copy=True), key)
+            return tensor
+
+        def produce(key):
+            return patched(key).cpu().to(target_dtype or tensors[key].dtype)
+
+        entries = [(k, target_dtype or v.dtype, tuple(v.shape)) for k, v in tensors.items()]
+
+        keep_order = False
+        if fp8_dtype is not None:
+            # Quantize .weight matrices not matched by a skip rule; everything else keeps its
+            # dtype (unscaled fp8 sources are widened to bf16).
+            rules = [rule.strip() for rule in fp8_skip.split(",") if rule.strip()]
+            scale_keys = {
+                k[: -len(".weight")] + ".scale_weight": k for k, v in tensors.items()
+                if k.endswith(".weight") and v.is_floating_point() and v.ndim >= 2 and not any(rule in k for rule in rules)
+                and k[: -len(".weight")] + ".scale_weight" not in tensors
+            }
+            weight_scales = {k: s_key for s_key, k in scale_keys.items()}
+            per_channel = fp8_scaling == "per_channel"
+            kept = {
+                k: (torch.bfloat16 if v.is_floating_point() and v.element_size() == 1 else v.dtype)
+                for k, v in tensors.items() if k not in weight_scales
+            }
+            log.info(f"Quantizing {len(weight_scales)} of {len(tensors)} tensors to {save_dtype} ({fp8_scaling}), "
+                     f"{len(kept)} kept unquantized...")
+
+            # Each scale is written right before its weight, so one patch produces both. That
+            # keeps the fp32 scales 4-byte aligned only if every weight before them fills whole
+            # 4-byte words. Weights that don't have their scales computed up front instead,
+            # written with the other fp32 tensors.
+            def scale_shape(k):
+                return (tensors[k].shape[0],) + (1,) * (tensors[k].ndim - 1) if per_channel else ()
+
+            paired = sorted(k for k in weight_scales if tensors[k].numel() % 4 == 0)
+            scales = {
+                k: _fp8_scale(patched(k), fp8_dtype, per_channel)
+                for k in sorted(set(weight_scales) - set(paired))
+            }
+            by_width = {}
+            for k, dtype in kept.items():
+                by_width.setdefault(dtype.itemsize, []).append((k, dtype, tuple(tensors[k].shape)))
+            for k, scale in scales.items():
+                by_width.setdefault(4, []).append((weight_scales[k], torch.float32, tuple(scale.shape)))
+                by_width.setdefault(1, []).append((k, fp8_dtype, tuple(tensors[k].shape)))
+            # Marker ComfyUI uses to detect scaled fp8 checkpoints (its dtype is the fp8 format)
+            if "scaled_fp8" not in tensors:
+                by_width.setdefault(1, []).append(("scaled_fp8", fp8_dtype, (0,)))
+            entries = sorted(by_width.pop(8, []))
+            for k in paired:
+                entries += [(weight_scales[k], torch.float32, scale_shape(k)), (k, fp8_dtype, tuple(tensors[k].shape))]
+            for width in sorted(by_width, reverse=True):
+                entries += sorted(by_width[width])
+            keep_order = True
+
+            pending, claimed, lock = {}, {}, threading.Lock()
+
+            def produce(key):
+                if key == "scaled_fp8":
+                    return torch.empty(0, dtype=fp8_dtype)
+                k = scale_keys.get(key, key)
+                if k in scales:
+                    return scales[k] if key in scale_keys else _fp8_quantize(patched(k), scales[k], fp8_dtype).cpu()
+                if k not in weight_scales:
+                    return patched(k).cpu().to(kept[k])
+                # Paired weight: the first of scale / weight to be requested quantizes and leaves
+                # the other half in pending. Shards may request the two from different threads.
+                with lock:
+                    done = claimed.get(k)
+                    if done is None:
+                        claimed[k] = done = threading.Event()
+                        owner = True
+                    else:
+                        owner = False
+                if not owner:
+                    done.wait()
+                    with lock:
+                        result = pending.pop(key, None)
+                    if result is None:
+                        raise RuntimeError(f"fp8 quantization of '{k}' failed in another writer.")
+                    return result
+                try:
+                    weight = patched(k)
+                    scale = _fp8_scale(weight, fp8_dtype, per_channel)
+                    quantized = _fp8_quantize(weight, scale, fp8_dtype).cpu()
+                    del weight
+                    with lock:
+                        if key in scale_keys:
+                            pending[k] = quantized
+                            return scale
+                        pending[weight_scales[k]] = scale
+                        return quantized
+                finally:
+                    done.set()
+
+        if save_format in DELTA_FORMATS:
+            base_path = _find_checkpoint(pipeline, model_name)
+            if not base_path:
+                raise RuntimeError(f"Delta save needs the checkpoint '{model_name}' the model was loaded from.")
+            output_path = os.path.join(output_dir, f"{stem}.delta.safetensors")
+            log.info(f"Saving delta against {base_path} to: {output_path}")
+            start = time.perf_counter()
+            counts = _save_delta(
+                output_path, tensors, patched, target_dtype, base_path, metadata,
+                delta_rank if save_format == "delta_lowrank" else 0,
+                on_tensor=lambda key: pbar.update(1), prefetch=prefetch,
+            )
+            elapsed = time.perf_counter() - start
+            log.info(f"Delta saved successfully: {os.path.basename(output_path)} — {counts['base']} tensors from base, "
+                     f"{counts['lowrank']} low-rank, {counts['full']} full")
+            log.info(f"Wrote {os.path.getsize(output_path) / 1024 ** 3:.2f} GB in {elapsed:.1f}s")
+            del tensors
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            return ()
 
         log.info(f"Saving merged WanVideo model to: {output_path}")
-        log.info(f"Number of tensors: {len(clean_sd)}")
+        log.info(f"Number of tensors: {len(entries)}")
 
-        save_file(clean_sd, output_path, metadata=metadata)
+        start = time.perf_counter()
+        files = _save_sharded(
+            output_dir, stem, entries, produce, metadata,
+            max_shard_bytes=int(max_shard_gb * 1024 ** 3), workers=workers, on_tensor=lambda key: pbar.update(1), prefetch=prefetch,
+            keep_order=keep_order,
+        )
+        elapsed = time.perf_counter() - start
+        total_bytes = sum(os.path.getsize(os.path.join(output_dir, f)) for f in files)
 
-        log.info(f"Model saved successfully: {filename}")
-        del clean_sd
+        log.info(f"Model saved successfully: {files[0]}" + (f" ({len(files) - 1} shards)" if len(files) > 1 else ""))
+        log.info(f"Wrote {total_bytes / 1024 ** 3:.2f} GB in {elapsed:.1f}s ({total_bytes / 1024 ** 3 / max(elapsed, 1e-9):.2f} GB/s)")
+        del tensors
 
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
@@ -170,10 +768,53 @@ class WanVideoSaveMergedModel:
         return ()
 
 
+class WanVideoLoadDeltaModel:
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "model": ("WANVIDEOMODEL", {"tooltip": "The delta's base checkpoint, loaded with the WanVideo Model Loader"}),
+                "delta_path": ("STRING", {"default": "", "tooltip": "Absolute path to a .delta.safetensors file from WanVideo Save Merged Model"}),
+            },
+            "optional": {
+                "base_path": ("STRING", {
+                    "default": "",
+                    "tooltip": "Path of the checkpoint the model was loaded from, to check it against the delta. Leave empty to use the model's own base path, or look the file up by name in the ComfyUI model folders."
+                }),
+                "verify_base": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Check the base checkpoint's sha256 against the delta (reads the whole file once). Otherwise only its size is checked."
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("WANVIDEOMODEL",)
+    RETURN_NAMES = ("model",)
+    OUTPUT_TOOLTIPS = ("The model with the delta applied as patches.",)
+    FUNCTION = "load"
+    CATEGORY = "WanVideoWrapper"
+    DESCRIPTION = "Applies a delta save on top of the base model it was saved against, as model patches (like a LoRA). Nothing is written to disk; low-rank diffs are multiplied out only when each weight is patched"
+
+    def load(self, model, delta_path, base_path="", verify_base=False):
+        delta_path = os.path.expanduser(delta_path)
+        pipeline = getattr(model.model, "pipeline", None) or {}
+        base_path = os.path.expanduser(base_path) or _find_checkpoint(pipeline, pipeline.get("model_name", "")) or ""
+        delta = DeltaStateDict(delta_path, base_path, verify_base)
+        patches = delta.patches()
+        model = model.clone()
+        added = model.add_patches(patches, 1.0, 1.0)
+        log.info(f"Applied delta {delta_path} over {delta.base_path}: {len(added)} of {len(patches)} patches")
+        if len(added) < len(patches):
+            log.warning(f"{len(patches) - len(added)} delta tensors have no matching weight in the model and were skipped")
+        return (model,)
+
+
 NODE_CLASS_MAPPINGS = {
     "WanVideoSaveMergedModel": WanVideoSaveMergedModel,
+    "WanVideoLoadDeltaModel": WanVideoLoadDeltaModel,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "WanVideoSaveMergedModel": "WanVideo Save Merged Model",
+    "WanVideoLoadDeltaModel": "WanVideo Load Delta Model",
 }
@@ -0,0 +1,73 @@
+"""Run the node modules under plain pytest, without ComfyUI.
+
+The repo root is the custom-node package (its modules use relative imports), so it is mounted
+under a fixed name. save_node imports folder_paths and comfy.utils at module level; when
+ComfyUI is not on the path, minimal stand-ins are registered so the package imports.
+"""
+import importlib
+import pathlib
+import sys
+import tempfile
+import types
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+PACKAGE = "vace_tools"
+
+
+def _stub_comfy():
+    try:
+        import folder_paths  # noqa: F401
+        import comfy.utils  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    class ProgressBar:
+        def __init__(self, total):
+            pass
+
+        def update(self, value):
+            pass
+
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths.models_dir = tempfile.mkdtemp(prefix="vace_tools_models_")
+    comfy = types.ModuleType("comfy")
+    comfy_utils = types.ModuleType("comfy.utils")
+    comfy_utils.ProgressBar = ProgressBar
+    comfy_utils.load_torch_file = lambda path, device=None: {}
+    comfy.utils = comfy_utils
+    sys.modules.update({"folder_paths": folder_paths, "comfy": comfy, "comfy.utils": comfy_utils})
+
+
+_stub_comfy()
+if PACKAGE not in sys.modules:
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(ROOT)]
+    sys.modules[PACKAGE] = package
+
+
+@pytest.fixture(scope="session")
+def nodes():
+    return importlib.import_module(f"{PACKAGE}.nodes")
+
+
+@pytest.fixture(scope="session")
+def merge_node():
+    return importlib.import_module(f"{PACKAGE}.merge_node")
+
+
+@pytest.fixture(scope="session")
+def plan_node():
+    return importlib.import_module(f"{PACKAGE}.plan_node")
+
+
+@pytest.fixture(scope="session")
+def save_node():
+    return importlib.import_module(f"{PACKAGE}.save_node")
+
+
+@pytest.fixture(scope="session")
+def frame_source():
+    return importlib.import_module(f"{PACKAGE}.frame_source")
@@ -0,0 +1,41 @@
+"""auto_context: chosen and default settings agree with what Source Prep actually keeps."""
+import pytest
+import torch
+
+CASES = [
+    ("End Extend", 120, 0, 0), ("Pre Extend", 120, 0, 0), ("Middle Extend", 120, 50, 0), ("Edge Extend", 120, 0, 0),
+    ("Join Extend", 200, 0, 0), ("Join Extend", 9, 0, 0), ("Join Extend", 60, 0, 45), ("Bidirectional Extend", 40, 0, 0),
+]
+
+
+def kept(nodes, mode, frames, split_index, frames_2, edge_frames, input_left=0, input_right=0):
+    """Context frames Source Prep passes on (frame counts only: 1x1-pixel clips)."""
+    source_2 = torch.zeros(frames_2, 1, 1, 3) if frames_2 else None
+    trimmed = nodes.VACESourcePrep().prepare(torch.zeros(frames, 1, 1, 3), mode, split_index, input_left, input_right,
+                                             edge_frames, source_clip_2=source_2)[0]
+    return trimmed.shape[0]
+
+
+@pytest.mark.parametrize("mode, frames, split_index, frames_2", CASES)
+@pytest.mark.parametrize("edge_frames, min_context", [(10, 8), (4, 12)])
+def test_matches_source_prep(nodes, plan_node, mode, frames, split_index, frames_2, edge_frames, min_context):
+    plan = plan_node.auto_context(mode, frames, min_context, 32, split_index, edge_frames, frames_2)
+    chosen = kept(nodes, mode, frames, split_index, frames_2, edge_frames, plan["input_left"], plan["input_right"])
+    default = kept(nodes, mode, frames, split_index, frames_2, edge_frames)
+    assert plan["target_frames"] == nodes._snap_4n1(chosen + 32)
+    assert plan["naive_target_frames"] == nodes._snap_4n1(default + 32)
+    assert plan["frames_saved"] == plan["naive_target_frames"] - plan["target_frames"]
+
+
+def test_join_extend_saving_is_not_overstated(plan_node):
+    plan = plan_node.auto_context("Join Extend", 200, 8, 32, edge_frames=10)
+    # the defaults keep 10 frames per side, not all 100
+    assert (plan["target_frames"], plan["naive_target_frames"], plan["frames_saved"]) == (49, 53, 4)
+    assert plan_node.auto_context("Join Extend", 200, 12, 32, edge_frames=10)["frames_saved"] < 0
+
+
+def test_rejects_out_of_range_split(plan_node):
+    with pytest.raises(ValueError):
+        plan_node.auto_context("Middle Extend", 40, 8, 32, split_index=40)
+    with pytest.raises(ValueError):
+        plan_node.auto_context("Replace/Inpaint", 40, 8, 32, split_index=40)
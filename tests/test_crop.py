@@ -0,0 +1,104 @@
+"""Video Inpaint crop_to_mask: aligned mask boxes and pasting the cropped result back."""
+import pytest
+import torch
+
+
+def box_mask(frames, height, width, top, left, box_h, box_w):
+    mask = torch.zeros(frames, height, width)
+    mask[:, top:top + box_h, left:left + box_w] = 1.0
+    return mask
+
+
+@pytest.mark.parametrize("start, end, limit, expected", [
+    (5, 20, 100, (0, 32)),
+    (33, 47, 100, (32, 48)),
+    (1030, 1080, 1080, (1016, 1080)),   # would end at 1088: shifted back, size kept
+    (1063, 1075, 1080, (1048, 1080)),
+    (70, 99, 100, (52, 100)),           # start leaves the grid when limit is off it
+    (1, 99, 100, (0, 100)),             # aligned size 112 > 100: whole axis
+])
+def test_align_span(nodes, start, end, limit, expected):
+    got = nodes._align_span(start, end, limit, 16)
+    assert got == expected
+    lo, hi = got
+    assert 0 <= lo <= start and end <= hi <= limit
+    assert (hi - lo) % 16 == 0 or got == (0, limit)
+
+
+@pytest.mark.parametrize("top, left, box_h, box_w", [
+    (500, 900, 40, 60), (1050, 900, 30, 60), (1060, 1880, 20, 40), (0, 0, 10, 10), (700, 1700, 380, 220),
+])
+def test_mask_bbox_stays_aligned_inside_1080p(nodes, top, left, box_h, box_w):
+    height, width, padding = 1080, 1920, 32
+    box = nodes._mask_bbox(box_mask(1, height, width, top, left, box_h, box_w), padding, height, width)
+    assert box is not None
+    b_top, b_left, b_bottom, b_right = box
+    assert 0 <= b_top and b_bottom <= height and 0 <= b_left and b_right <= width
+    assert b_top <= max(0, top - padding) and b_bottom >= min(height, top + box_h + padding)
+    assert b_left <= max(0, left - padding) and b_right >= min(width, left + box_w + padding)
+    assert (b_bottom - b_top) % nodes.CROP_ALIGN == 0 and (b_right - b_left) % nodes.CROP_ALIGN == 0
+    assert b_top % nodes.LATENT_SPATIAL == 0 and b_left % nodes.LATENT_SPATIAL == 0
+    # A box at the bottom edge is shifted up, not widened to the whole frame height
+    assert b_bottom - b_top < height
+
+
+def test_mask_bbox_empty_or_full_frame(nodes):
+    assert nodes._mask_bbox(torch.zeros(3, 64, 64), 8, 64, 64) is None
+    assert nodes._mask_bbox(box_mask(3, 64, 64, 2, 2, 60, 60), 8, 64, 64) is None
+    # Union over frames: a mask that moves between frames gets one box covering both
+    mask = torch.zeros(2, 128, 128)
+    mask[0, 10:20, 10:20] = 1.0
+    mask[1, 90:100, 90:100] = 1.0
+    assert nodes._mask_bbox(mask, 0, 128, 128) == (0, 0, 112, 112)
+
+
+def prep_crop(nodes, frames=5, height=120, width=160, top=96, left=20, box_h=20, box_w=30, padding=8):
+    source = torch.rand(frames, height, width, 3, generator=torch.Generator().manual_seed(0))
+    mask = box_mask(frames, height, width, top, left, box_h, box_w)
+    cropped, _, _, _, cropped_mask, _, pipe = nodes.VACESourcePrep().prepare(
+        source, "Video Inpaint", inpaint_mask=mask, crop_to_mask=True, crop_padding=padding)
+    return source, cropped, cropped_mask, pipe
+
+
+def test_crop_prep_views_match_the_box(nodes):
+    source, cropped, cropped_mask, pipe = prep_crop(nodes)
+    top, left, bottom, right = pipe["crop"]
+    assert bottom == 120 and (bottom - top) % 16 == 0  # shifted back from the bottom edge
+    assert torch.equal(cropped, source[:, top:bottom, left:right])
+    assert cropped_mask.shape == cropped.shape[:3] and cropped_mask.sum() == 5 * 20 * 30
+
+
+@pytest.mark.parametrize("vace_frames", [5, 8, 3])
+def test_crop_paste_back(nodes, merge_node, vace_frames):
+    source, cropped, _, pipe = prep_crop(nodes)
+    top, left, bottom, right = pipe["crop"]
+    vace = torch.rand((vace_frames,) + cropped.shape[1:], generator=torch.Generator().manual_seed(1))
+    n = min(vace_frames, source.shape[0])
+
+    hard = merge_node.VACEMergeBack().merge(source, vace, pipe, "none", "fast", crop_feather=0)[0]
+    assert hard.shape == source.shape
+    assert torch.equal(hard[:n, top:bottom, left:right], vace[:n])
+    outside = torch.ones(source.shape[1:3], dtype=torch.bool)
+    outside[top:bottom, left:right] = False
+    assert torch.equal(hard[:, outside], source[:, outside])
+    assert torch.equal(hard[n:], source[n:])
+
+    feather = 4
+    soft = merge_node.VACEMergeBack().merge(source, vace, pipe, "none", "fast", crop_feather=feather)[0]
+    assert torch.equal(soft[:, outside], source[:, outside])
+    # Interior past the feather is the VACE result; the bottom edge lies on the frame border and stays hard
+    inner = soft[:n, top + feather:bottom, left + feather:right - feather]
+    assert torch.allclose(inner, vace[:n, feather:, feather:-feather])
+    edge = soft[:n, top, left + feather:right - feather]
+    assert not torch.allclose(edge, vace[:n, 0, feather:-feather])
+
+
+def test_shifted_crop_pastes_on_the_latent_grid(nodes, merge_node):
+    source, cropped, _, pipe = prep_crop(nodes)
+    top, left, bottom, right = pipe["crop"]
+    g = torch.Generator().manual_seed(2)
+    source_latent = torch.rand(1, 16, 2, 120 // 8, 160 // 8, generator=g)
+    vace_latent = torch.rand(1, 16, 2, (bottom - top) // 8, (right - left) // 8, generator=g)
+    merged = merge_node.VACEMergeBackLatent().merge(
+        {"samples": source_latent}, {"samples": vace_latent}, pipe, "none", crop_feather=0)[0]["samples"]
+    assert torch.equal(merged[..., top // 8:bottom // 8, left // 8:right // 8], vace_latent)
@@ -0,0 +1,111 @@
+"""Delta saves: applied to the base model as patches, they reproduce a full save."""
+import os
+import types
+
+import pytest
+import torch
+from safetensors.torch import load_file, save_file
+
+DIM, RANK = 256, 4
+
+
+class Patcher:
+    """Minimal stand-in for ComfyUI's ModelPatcher; patches are applied like comfy.lora.calculate_weight."""
+
+    def __init__(self, sd, base_path, patches=None):
+        pipeline = {"model_name": os.path.basename(base_path), "sd": sd, "base_path": base_path}
+        self.model = types.SimpleNamespace(pipeline=pipeline, diffusion_model=None)
+        self.patches = {k: list(v) for k, v in (patches or {}).items()}
+
+    def clone(self):
+        return Patcher(self.model.pipeline["sd"], self.model.pipeline["base_path"], self.patches)
+
+    def add_patches(self, patches, strength_patch=1.0, strength_model=1.0):
+        added = [k for k in patches if k in self.model.pipeline["sd"]]
+        for k in added:
+            self.patches.setdefault(k, []).append((strength_patch, patches[k], strength_model, None, None))
+        return added
+
+    def calculate_weight(self, patches, weight, key):
+        for strength, (kind, v), *_ in patches:
+            if kind == "set":
+                weight.copy_(v[0])
+            elif kind == "lora":
+                weight += strength * (v[0].float() @ v[1].float()).reshape(weight.shape)
+        return weight
+
+    def state_dict(self):
+        sd = self.model.pipeline["sd"]
+        return {k: self.calculate_weight(self.patches[k], v.to(torch.float32, copy=True), k).to(v.dtype) if k in self.patches else v
+                for k, v in sd.items()}
+
+
+def lora(rank, scale, generator):
+    return ("lora", (torch.randn(DIM, rank, generator=generator) * scale, torch.randn(rank, DIM, generator=generator) * scale,
+                     None, None, None))
+
+
+@pytest.fixture
+def variant(tmp_path):
+    """(base checkpoint path, base state dict with VACE weights, LoRA patches of the variant)."""
+    g = torch.Generator().manual_seed(0)
+    base = {f"blocks.{i}.{n}.weight": torch.randn(DIM, DIM, generator=g) for i in range(4) for n in ("q", "k", "v")}
+    base.update({f"blocks.{i}.norm.weight": torch.randn(DIM, generator=g) for i in range(4)})
+    base_path = str(tmp_path / "base.safetensors")
+    save_file(base, base_path)
+    sd = dict(base, **{f"vace_blocks.{i}.weight": torch.randn(DIM, DIM, generator=g) for i in range(2)})
+    patches = {f"blocks.{i}.q.weight": [(1.0, lora(RANK, 0.1, g), 1.0, None, None)] for i in range(4)}
+    patches["blocks.0.v.weight"] = [(1.0, lora(DIM, 0.1, g), 1.0, None, None)]  # full rank: stored in full
+    return base_path, sd, patches
+
+
+def save(save_node, tmp_path, variant, prefix, save_format, save_dtype="same"):
+    base_path, sd, patches = variant
+    save_node.WanVideoSaveMergedModel().save_model(Patcher(sd, base_path, patches), prefix, save_dtype, str(tmp_path),
+                                                    save_format=save_format)
+    suffix = ".safetensors" if save_format == "full" else ".delta.safetensors"
+    return str(tmp_path / f"{prefix}{suffix}")
+
+
+def apply(save_node, variant, delta_path):
+    base_path, sd, _ = variant
+    return save_node.WanVideoLoadDeltaModel().load(Patcher(sd, base_path), delta_path)[0]
+
+
+def test_lossless_delta_matches_full_save(save_node, tmp_path, variant):
+    full = load_file(save(save_node, tmp_path, variant, "full", "full"))
+    delta_path = save(save_node, tmp_path, variant, "lossless", "delta_lossless")
+    before = sorted(os.listdir(tmp_path))
+    model = apply(save_node, variant, delta_path)
+    assert sorted(os.listdir(tmp_path)) == before
+    # only changed and base-missing weights are patched
+    assert set(model.patches) == set(variant[2]) | {"vace_blocks.0.weight", "vace_blocks.1.weight"}
+    got = model.state_dict()
+    assert set(got) == set(full)
+    for k in full:
+        assert torch.equal(got[k], full[k]), k
+
+
+def test_lowrank_delta_is_compact_and_close(save_node, tmp_path, variant):
+    base_path, sd, patches = variant
+    full = load_file(save(save_node, tmp_path, variant, "full", "full", "fp32"))
+    lossless = save(save_node, tmp_path, variant, "lossless", "delta_lossless", "fp32")
+    lowrank = save(save_node, tmp_path, variant, "lowrank", "delta_lowrank", "fp32")
+    # the low-rank factors of the rank-4 diffs are a fraction of the full weights
+    stored = DIM * DIM * 4 * (len(patches) - 1)
+    assert os.path.getsize(lossless) - os.path.getsize(lowrank) > stored // 2
+    got = apply(save_node, variant, lowrank).state_dict()
+    for k in full:
+        if k in patches and k != "blocks.0.v.weight":
+            diff = full[k] - sd[k]
+            assert (got[k] - sd[k] - diff).norm() <= save_node.DELTA_TOLERANCE * diff.norm(), k
+        else:
+            assert torch.equal(got[k], full[k]), k
+
+
+def test_delta_refuses_other_base(save_node, tmp_path, variant):
+    delta_path = save(save_node, tmp_path, variant, "lossless", "delta_lossless")
+    other = str(tmp_path / "other.safetensors")
+    save_file({"x": torch.zeros(3)}, other)
+    with pytest.raises(ValueError):
+        save_node.WanVideoLoadDeltaModel().load(Patcher(variant[1], other), delta_path)
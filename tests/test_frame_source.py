@@ -0,0 +1,86 @@
+"""VACE Frame Source: lazy slicing of .npy arrays and image directories, and change detection."""
+import os
+
+import numpy as np
+import pytest
+import torch
+
+INDEXES = [
+    slice(None), slice(2, 5), slice(1, 7, 2), slice(-3, None), slice(4, 4), 0, 3, -1,
+    (slice(1, 4), 2), (slice(None, None, 3), slice(None), 1),
+]
+
+
+def frames_u8(count=7, height=6, width=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (count, height, width, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def npy_path(tmp_path):
+    path = tmp_path / "frames.npy"
+    np.save(path, frames_u8().astype(np.float32) / 255.0)
+    return str(path)
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    folder = tmp_path / "frames"
+    folder.mkdir()
+    for i, frame in enumerate(frames_u8()):
+        # Unpadded numbering: natural order puts frame_10 after frame_2
+        Image.fromarray(frame).save(folder / f"frame_{i * 5}.png")
+    (folder / "notes.txt").write_text("not a frame")
+    return str(folder)
+
+
+@pytest.mark.parametrize("index", INDEXES)
+def test_npy_slices_match_eager_tensor(frame_source, npy_path, index):
+    source = frame_source.FrameSource(npy_path)
+    full = torch.from_numpy(np.load(npy_path))
+    assert source.shape == full.shape and source.dtype == full.dtype
+    assert torch.equal(source[index], full[index])
+
+
+@pytest.mark.parametrize("index", INDEXES)
+def test_image_dir_slices_match_eager_tensor(frame_source, image_dir, index):
+    source = frame_source.FrameSource(image_dir)
+    full = torch.from_numpy(frames_u8().astype(np.float32) / 255.0)
+    assert source.shape == full.shape and source.dtype == torch.float32
+    assert torch.equal(source[index], full[index])
+
+
+def test_frame_count_limits_both_backends(frame_source, npy_path, image_dir):
+    for path in (npy_path, image_dir):
+        source = frame_source.FrameSource(path, frame_count=4)
+        assert len(source) == 4 and source.load().shape[0] == 4
+        assert torch.equal(source[-1], frame_source.FrameSource(path)[3])
+
+
+def test_is_changed_sees_frames_overwritten_in_place(frame_source, image_dir):
+    Image = pytest.importorskip("PIL.Image")
+    is_changed = frame_source.VACEFrameSource.IS_CHANGED
+    before = is_changed(image_dir)
+    assert is_changed(image_dir) == before
+
+    target = os.path.join(image_dir, "frame_10.png")
+    dir_mtime = os.stat(image_dir).st_mtime_ns
+    Image.fromarray(frames_u8(count=1, seed=1)[0]).save(target)
+    os.utime(target, ns=(os.stat(target).st_atime_ns, os.stat(target).st_mtime_ns + 10**9))
+    assert os.stat(image_dir).st_mtime_ns == dir_mtime  # the directory listing itself did not change
+    after = is_changed(image_dir)
+    assert after != before
+
+    os.rename(target, os.path.join(image_dir, "frame_11.png"))
+    assert is_changed(image_dir) != after
+
+
+def test_is_changed_on_npy_and_missing_path(frame_source, npy_path):
+    is_changed = frame_source.VACEFrameSource.IS_CHANGED
+    before = is_changed(npy_path)
+    assert is_changed(npy_path) == before
+    np.save(npy_path, frames_u8(count=3).astype(np.float32))
+    assert is_changed(npy_path) != before
+    missing = is_changed(npy_path + ".gone")
+    assert missing != missing  # NaN: always re-run
@@ -0,0 +1,66 @@
+"""VACE Merge Back splices: alpha / none blends match the original per-frame implementation."""
+import pytest
+import torch
+
+
+def clip(frames, height=8, width=12, seed=0):
+    return torch.rand(frames, height, width, 3, generator=torch.Generator().manual_seed(seed))
+
+
+def reference_merge(source_clip, vace_output, pipe, blend_method, source_clip_2=None):
+    """The per-frame splice Merge Back started from: copy, then blend left and right context in turn."""
+    trim_start, trim_end = pipe["trim_start"], pipe["trim_end"]
+    left_ctx, right_ctx = pipe["left_ctx"], pipe["right_ctx"]
+    V = vace_output.shape[0]
+    tail_src = source_clip_2 if (pipe.get("two_clip", False) and source_clip_2 is not None) else source_clip
+    result = torch.cat([source_clip[:trim_start], vace_output, tail_src[trim_end:]])
+    if blend_method == "none":
+        return result
+    n = min(left_ctx, max(0, source_clip.shape[0] - trim_start))
+    for j in range(n):
+        alpha = (j + 1) / (left_ctx + 1)
+        result[trim_start + j] = source_clip[trim_start + j] * (1.0 - alpha) + vace_output[j] * alpha
+    rs = trim_end - right_ctx
+    n = min(right_ctx, max(0, tail_src.shape[0] - rs)) if right_ctx > 0 else 0
+    for j in range(n):
+        alpha = 1.0 - (j + 1) / (right_ctx + 1)
+        k = V - right_ctx + j
+        result[trim_start + k] = tail_src[rs + j] * (1.0 - alpha) + vace_output[k] * alpha
+    return result
+
+
+PREP_CASES = [
+    ("End Extend", 0, 12, 0, 0), ("Pre Extend", 0, 0, 9, 0), ("Middle Extend", 20, 6, 7, 0),
+    ("Middle Extend", 30, 25, 3, 0), ("Replace/Inpaint", 12, 5, 6, 4), ("Bidirectional Extend", 0, 8, 0, 0),
+    ("Join Extend", 0, 0, 0, 6),
+]
+
+
+@pytest.mark.parametrize("blend_method", ["none", "alpha"])
+@pytest.mark.parametrize("mode, split_index, input_left, input_right, edge_frames", PREP_CASES)
+def test_splice_matches_reference(nodes, merge_node, blend_method, mode, split_index, input_left, input_right, edge_frames):
+    source = clip(40)
+    trimmed, *_, pipe = nodes.VACESourcePrep().prepare(source, mode, split_index, input_left, input_right, edge_frames)
+    for extra in (0, 5):
+        vace = clip(trimmed.shape[0] + extra, seed=1)
+        got = merge_node.VACEMergeBack().merge(source, vace, pipe, blend_method, "fast")[0]
+        assert torch.equal(got, reference_merge(source, vace, pipe, blend_method)), (mode, extra)
+
+
+def test_two_clip_join_matches_reference(nodes, merge_node):
+    first, second = clip(20), clip(16, seed=2)
+    trimmed, *_, pipe = nodes.VACESourcePrep().prepare(first, "Join Extend", edge_frames=5, source_clip_2=second)
+    vace = clip(trimmed.shape[0] + 4, seed=1)
+    got = merge_node.VACEMergeBack().merge(first, vace, pipe, "alpha", "fast", source_clip_2=second)[0]
+    assert torch.equal(got, reference_merge(first, vace, pipe, "alpha", second))
+
+
+@pytest.mark.parametrize("left_ctx, right_ctx, frames", [(23, 6, 24), (20, 10, 22), (15, 4, 30)])
+def test_left_zone_past_truncated_right_zone(merge_node, left_ctx, right_ctx, frames):
+    """Left context longer than right context plus the generated span, with the right zone cut
+    short by the source: left-blend frames after the right zone are kept, as in the reference."""
+    source = clip(frames)
+    pipe = {"mode": "Middle Extend", "trim_start": 0, "trim_end": frames + 2, "left_ctx": left_ctx, "right_ctx": right_ctx}
+    vace = clip(24, seed=1)
+    got = merge_node.VACEMergeBack().merge(source, vace, pipe, "alpha", "fast")[0]
+    assert torch.equal(got, reference_merge(source, vace, pipe, "alpha"))
@@ -0,0 +1,225 @@
+"""Optical-flow seam blending: backends, worker threads, proxy flow, tiling and the flow cache."""
+import numpy as np
+import pytest
+import torch
+
+cv2 = pytest.importorskip("cv2")
+
+
+def smooth_frames(frames, height, width, seed=0):
+    """Low-frequency random frames in [0, 1], so bilinear sampling error stays small."""
+    g = torch.Generator().manual_seed(seed)
+    coarse = torch.rand(frames, 3, height // 8 + 2, width // 8 + 2, generator=g)
+    out = torch.nn.functional.interpolate(coarse, size=(height, width), mode="bicubic", align_corners=False)
+    return out.clamp(0, 1).permute(0, 2, 3, 1).contiguous()
+
+
+def fixed_flow(cv2, gray_a, gray_b, params):
+    """A sub-pixel rotation plus translation field, the same for every frame pair."""
+    h, w = gray_a.shape
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+    flow = np.stack([2.3 + 0.02 * (y - h / 2), -1.7 - 0.02 * (x - w / 2)], axis=-1)
+    return flow.astype(np.float32)
+
+
+# Both backends on one flow field: cv2 works on 8-bit frames and cv2.remap samples at 1/32 px,
+# so the two agree to within about two 8-bit levels
+WARP_TOLERANCE = 2 / 255
+
+
+def test_torch_warp_matches_cv2_remap(merge_node, monkeypatch):
+    monkeypatch.setattr(merge_node, "_farneback", fixed_flow)
+    a, b = smooth_frames(5, 48, 64), smooth_frames(5, 48, 64, seed=1)
+    alphas = [0.1, 0.3, 0.5, 0.7, 0.9]
+    batched = merge_node._optical_flow_blend_batch(a, b, alphas, "fast")
+    for j, alpha in enumerate(alphas):
+        single = merge_node._optical_flow_blend(a[j], b[j], alpha, "fast")
+        assert (single - batched[j]).abs().max() <= WARP_TOLERANCE, j
+
+
+def test_zero_flow_warp_is_a_crossfade(merge_node, monkeypatch):
+    monkeypatch.setattr(merge_node, "_farneback", lambda cv2, a, b, params: np.zeros(a.shape + (2,), np.float32))
+    a, b = smooth_frames(3, 16, 24), smooth_frames(3, 16, 24, seed=1)
+    alphas = [0.25, 0.5, 0.75]
+    batched = merge_node._optical_flow_blend_batch(a, b, alphas, "fast")
+    crossfade = torch.stack([merge_node._alpha_blend(a[j], b[j], alpha) for j, alpha in enumerate(alphas)])
+    torch.testing.assert_close(batched, crossfade, atol=1e-6, rtol=0)
+
+
+def test_ordered_map_keeps_index_order(merge_node):
+    import time
+
+    def slow_first(j):
+        time.sleep(0.002 * (8 - j))  # later indices finish first
+        return j
+
+    assert merge_node._ordered_map(slow_first, 8, 4) == list(range(8))
+    assert merge_node._ordered_map(slow_first, 8, 1) == list(range(8))
+
+
+@pytest.mark.parametrize("of_backend", ["cv2", "torch"])
+def test_worker_count_does_not_change_output(nodes, merge_node, of_backend):
+    source = smooth_frames(40, 32, 48)
+    trimmed, *_, pipe = nodes.VACESourcePrep().prepare(source, "Middle Extend", 20, 6, 6, 4)
+    vace = torch.roll(smooth_frames(trimmed.shape[0] + 5, 32, 48, seed=1), shifts=2, dims=2)
+
+    def merge(workers):
+        return merge_node.VACEMergeBack().merge(source, vace, pipe, "optical_flow", "fast",
+                                                of_backend=of_backend, of_workers=workers)[0]
+
+    single = merge(1)
+    assert torch.equal(merge(4), single)
+    # seam frames land where the single-threaded per-frame blend puts them
+    n = pipe["left_ctx"]
+    left = single[pipe["trim_start"]:pipe["trim_start"] + n]
+    alphas = [(j + 1) / (n + 1) for j in range(n)]
+    originals = source[pipe["trim_start"]:pipe["trim_start"] + n]
+    if of_backend == "cv2":
+        expected = torch.stack([merge_node._optical_flow_blend(originals[j], vace[j], alpha, "fast")
+                                for j, alpha in enumerate(alphas)])
+    else:
+        expected = merge_node._optical_flow_blend_batch(originals, vace[:n], alphas, "fast")
+    assert torch.equal(left, expected)
+
+
+def gray_pair(height, width, shift):
+    """Grayscale uint8 texture and the same texture moved by shift = (dy, dx) pixels."""
+    frame = smooth_frames(1, height, width)[0]
+    a = cv2.cvtColor((frame * 255).to(torch.uint8).numpy(), cv2.COLOR_RGB2GRAY)
+    return a, np.roll(a, shift, axis=(0, 1))
+
+
+def test_full_scale_flow_is_plain_farneback(merge_node):
+    a, b = gray_pair(64, 96, (2, 3))
+    for name, params in merge_node.OPTICAL_FLOW_PRESETS.items():
+        if params.get("flow_scale", 1.0) != 1.0:
+            continue
+        expected = cv2.calcOpticalFlowFarneback(
+            a, b, None, pyr_scale=0.5, levels=params["levels"], winsize=params["winsize"],
+            iterations=params["iterations"], poly_n=params["poly_n"], poly_sigma=params["poly_sigma"], flags=0,
+        )
+        assert np.array_equal(merge_node._farneback(cv2, a, b, params), expected), name
+        assert np.array_equal(merge_node._farneback(cv2, a, b, dict(params, flow_scale=1.0)), expected), name
+
+
+@pytest.mark.parametrize("scale", [0.5, 0.25])
+def test_proxy_flow_is_in_full_resolution_pixels(merge_node, monkeypatch, scale):
+    """A one-pixel flow at proxy resolution is 1 / scale pixels at full resolution."""
+    calls = []
+
+    class ProxyCv2:
+        def __getattr__(self, name):
+            return getattr(cv2, name)
+
+        def calcOpticalFlowFarneback(self, gray_a, gray_b, flow, **params):
+            calls.append(gray_a.shape)
+            return np.ones(gray_a.shape + (2,), np.float32)
+
+    a, b = gray_pair(64, 96, (0, 0))
+    params = dict(merge_node.OPTICAL_FLOW_PRESETS["balanced"], flow_scale=scale)
+    flow = merge_node._farneback(ProxyCv2(), a, b, params)
+    assert calls == [(round(64 * scale), round(96 * scale))]
+    assert flow.shape == (64, 96, 2)
+    np.testing.assert_allclose(flow, 1 / scale)
+
+
+@pytest.mark.parametrize("preset", ["balanced_half", "quality_quarter"])
+def test_proxy_flow_recovers_translation(merge_node, preset):
+    a, b = gray_pair(128, 192, (4, 8))
+    flow = merge_node._farneback(cv2, a, b, merge_node.OPTICAL_FLOW_PRESETS[preset])
+    interior = flow[24:-24, 24:-24].reshape(-1, 2)
+    np.testing.assert_allclose(np.median(interior, axis=0), [8, 4], atol=0.25)
+
+
+@pytest.mark.parametrize("size, tile, overlap", [(100, 32, 4), (72, 32, 4), (64, 32, 4), (30, 32, 4), (1080, 512, 64)])
+def test_tiles_cover_the_frame(merge_node, size, tile, overlap):
+    starts = merge_node._tile_starts(size, tile, overlap)
+    assert starts[0] == 0 and min(starts[-1] + tile, size) == size
+    for prev, start in zip(starts, starts[1:]):
+        assert prev + tile - start >= overlap
+
+
+def blend(merge_node, frames_a, frames_b, alphas, backend, tile):
+    out = torch.empty_like(frames_a)
+    merge_node._blend_zones([(out, frames_a, frames_b, alphas)], "optical_flow", "fast", backend, 1, tile)
+    return out
+
+
+@pytest.mark.parametrize("backend", ["cv2", "torch"])
+@pytest.mark.parametrize("tile", [32, 48])
+def test_tiled_warp_matches_untiled(merge_node, monkeypatch, backend, tile):
+    """With a position-independent flow each tile warps exactly like the whole frame, seams included.
+
+    72x100 is not a multiple of either tile size, so the last tiles are pulled back and overlap more.
+    """
+    monkeypatch.setattr(merge_node, "_farneback",
+                        lambda cv2, a, b, params: np.tile(np.array([3.0, 2.0], np.float32), a.shape + (1,)))
+    a, b = smooth_frames(3, 72, 100), smooth_frames(3, 72, 100, seed=1)
+    alphas = [0.25, 0.5, 0.75]
+    torch.testing.assert_close(blend(merge_node, a, b, alphas, backend, tile), blend(merge_node, a, b, alphas, backend, 0),
+                               atol=1e-5, rtol=0)
+
+
+@pytest.mark.parametrize("backend", ["cv2", "torch"])
+def test_tiled_flow_matches_untiled(merge_node, backend):
+    """Real Farneback per tile: a translated texture blends like the untiled frame away from the
+    frame border (where flow differs anyway), including across tile seams."""
+    texture = smooth_frames(3, 90, 120)
+    a, b = texture[:, 10:82, 10:110], texture[:, 8:80, 7:107]
+    alphas = [0.25, 0.5, 0.75]
+    untiled = blend(merge_node, a, b, alphas, backend, 0)
+    diff = (blend(merge_node, a, b, alphas, backend, 32) - untiled).abs()
+    assert diff[:, 6:-6, 6:-6].max() <= 3 / 255
+    assert diff.mean() <= 1e-3
+
+
+@pytest.fixture
+def flow_cache(merge_node, monkeypatch, tmp_path):
+    """A fresh, empty flow cache with its disk level in tmp_path."""
+    monkeypatch.setenv("VACE_FLOW_CACHE_DIR", str(tmp_path))
+    cache = merge_node._FlowCache(memory_budget=64 * 1024 ** 2, disk_budget=64 * 1024 ** 2)
+    monkeypatch.setattr(merge_node, "_FLOW_CACHE", cache)
+    return cache
+
+
+def seam_blend(merge_node, cache, seed=0):
+    a = smooth_frames(1, 48, 64, seed=seed)[0]
+    b = torch.roll(a, shifts=(2, 3), dims=(0, 1))
+    return merge_node._optical_flow_blend(a, b, 0.4, "fast", cache)
+
+
+def test_memory_cache_hit_matches_fresh_blend(merge_node, flow_cache):
+    fresh = seam_blend(merge_node, "memory")
+    assert flow_cache.stats()["misses"] == 1
+    assert torch.equal(seam_blend(merge_node, "memory"), fresh)
+    assert flow_cache.stats()["hits"] == 1
+    # cached flows are fp16: at most one 8-bit level from the uncached blend
+    assert (fresh - seam_blend(merge_node, "off")).abs().max() <= 1 / 255 + 1e-6
+
+
+def test_disk_cache_hit_matches_fresh_blend(merge_node, flow_cache, monkeypatch, tmp_path):
+    fresh = seam_blend(merge_node, "memory+disk")
+    assert [p.suffix for p in tmp_path.iterdir()] == [".npy"]
+    # a new process: empty memory level, same cache directory
+    restarted = merge_node._FlowCache(memory_budget=64 * 1024 ** 2, disk_budget=64 * 1024 ** 2)
+    monkeypatch.setattr(merge_node, "_FLOW_CACHE", restarted)
+    assert torch.equal(seam_blend(merge_node, "memory+disk"), fresh)
+    assert restarted.stats()["disk_hits"] == 1 and restarted.stats()["misses"] == 0
+
+
+def test_changed_inputs_miss_the_cache(merge_node, flow_cache):
+    a, b = gray_pair(48, 64, (2, 3))
+    params = merge_node.OPTICAL_FLOW_PRESETS["balanced"]
+    merge_node._cached_farneback(cv2, a, b, params, "memory")
+    variants = [
+        (a, np.roll(b, 1, axis=1), params),  # other frames
+        (a, b, dict(params, flow_scale=0.5)),  # proxy resolution
+        (a, b, dict(params, winsize=params["winsize"] + 2)),  # Farneback parameters
+        (a, b, dict(params, levels=params["levels"] + 1)),
+    ]
+    for i, (gray_a, gray_b, p) in enumerate(variants):
+        flow = merge_node._cached_farneback(cv2, gray_a, gray_b, p, "memory")
+        assert flow_cache.stats()["misses"] == i + 2 and flow_cache.stats()["hits"] == 0, i
+        np.testing.assert_allclose(flow, merge_node._farneback(cv2, gray_a, gray_b, p), atol=0.02, rtol=1e-3)
+    merge_node._cached_farneback(cv2, a, b, params, "memory")
+    assert flow_cache.stats()["hits"] == 1
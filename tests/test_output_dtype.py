@@ -0,0 +1,90 @@
+"""output_dtype: half-precision outputs match fp32 at half the bytes."""
+import pytest
+import torch
+
+HALF = [torch.float16, torch.bfloat16]
+
+
+def clip(frames=9, height=16, width=24, seed=0):
+    return torch.rand(frames, height, width, 3, generator=torch.Generator().manual_seed(seed))
+
+
+def mode_kwargs(mode, frames):
+    if mode == "Video Inpaint":
+        return {"inpaint_mask": (clip(frames, seed=1)[..., 0] > 0.5).float()}
+    return {}
+
+
+@pytest.mark.parametrize("dtype", [torch.float32] + HALF)
+@pytest.mark.parametrize("channels", [3, None])
+def test_solid_batch_matches_full(nodes, dtype, channels):
+    batch = nodes._create_solid_batch(5, 16, 24, nodes.GREY, dtype=dtype, channels=channels)
+    shape = (5, 16, 24) if channels is None else (5, 16, 24, 3)
+    assert torch.equal(batch, torch.full(shape, nodes.GREY, dtype=dtype))
+    assert nodes._create_solid_batch(0, 16, 24, nodes.GREY, dtype=dtype, channels=channels).shape == (0,) + shape[1:]
+
+
+def test_end_extend_matches_reference(nodes):
+    source = clip()
+    control, mask, target, _ = nodes.VACEMaskGenerator().generate(source, "End Extend", 21, 0, 8)
+    generated = target - source.shape[0]
+    assert torch.equal(control, torch.cat([source, torch.full((generated, 16, 24, 3), nodes.GREY)]))
+    assert torch.equal(mask, torch.cat([torch.full((9, 16, 24, 3), nodes.BLACK), torch.full((generated, 16, 24, 3), nodes.WHITE)]))
+
+
+@pytest.mark.parametrize("dtype_name, dtype", [("fp16", torch.float16), ("bf16", torch.bfloat16)])
+def test_mask_generator_half_matches_fp32(nodes, dtype_name, dtype):
+    source = clip()
+    for mode in nodes.VACE_MODES:
+        kwargs = mode_kwargs(mode, source.shape[0])
+        ref = nodes.VACEMaskGenerator().generate(source, mode, 21, 4, 3, output_dtype="fp32", **kwargs)
+        got = nodes.VACEMaskGenerator().generate(source, mode, 21, 4, 3, output_dtype=dtype_name, **kwargs)
+        assert got[2] == ref[2], mode
+        for r, g in zip(ref[:2], got[:2]):
+            assert g.dtype == dtype, mode
+            assert g.shape == r.shape, mode
+            torch.testing.assert_close(g.float(), r, atol=1e-2, rtol=0, msg=mode)
+            assert g.numel() * g.element_size() * 2 == r.numel() * r.element_size()
+
+
+def test_mask_outputs_are_not_shared(nodes):
+    """In-place edits of one run's outputs must not leak into the next run."""
+    source = clip()
+    for mode in ("End Extend", "Frame Interpolation"):
+        control, mask, _, _ = nodes.VACEMaskGenerator().generate(source, mode, 21, 0, 8)
+        expected = control.clone(), mask.clone()
+        control.fill_(0.25)
+        mask.fill_(0.25)
+        again = nodes.VACEMaskGenerator().generate(source, mode, 21, 0, 8)
+        assert torch.equal(again[0], expected[0]) and torch.equal(again[1], expected[1]), mode
+
+    prep = nodes.VACESourcePrep().prepare(source, "Edge Extend", edge_frames=2)
+    placeholder = prep[4].clone()
+    prep[4].fill_(1.0)
+    assert torch.equal(nodes.VACESourcePrep().prepare(source, "Edge Extend", edge_frames=2)[4], placeholder)
+
+
+@pytest.mark.parametrize("dtype_name, dtype", [("fp16", torch.float16), ("bf16", torch.bfloat16)])
+def test_source_prep_half_matches_fp32(nodes, dtype_name, dtype):
+    source = clip(17)
+    for mode in nodes.VACE_MODES:
+        kwargs = mode_kwargs(mode, source.shape[0])
+        ref = nodes.VACESourcePrep().prepare(source, mode, 8, 4, 4, 3, output_dtype="fp32", **kwargs)
+        got = nodes.VACESourcePrep().prepare(source, mode, 8, 4, 4, 3, output_dtype=dtype_name, **kwargs)
+        assert got[6] == ref[6], mode
+        for r, g in ((ref[0], got[0]), (ref[4], got[4])):
+            assert g.dtype == dtype, mode
+            torch.testing.assert_close(g.float(), r, atol=1e-2, rtol=0, msg=mode)
+
+
+@pytest.mark.parametrize("blend_method", ["none", "alpha"])
+def test_merge_back_half_matches_fp32(nodes, merge_node, blend_method):
+    source = clip(40)
+    for mode in ("End Extend", "Middle Extend", "Replace/Inpaint"):
+        trimmed, *_, pipe = nodes.VACESourcePrep().prepare(source, mode, 20, 5, 5, 5)
+        vace = clip(trimmed.shape[0] + 6, seed=2)
+        ref = merge_node.VACEMergeBack().merge(source, vace, pipe, blend_method, "fast", output_dtype="fp32")[0]
+        got = merge_node.VACEMergeBack().merge(source, vace, pipe, blend_method, "fast", output_dtype="fp16")[0]
+        assert got.dtype == torch.float16 and got.shape == ref.shape
+        torch.testing.assert_close(got.float(), ref, atol=1e-2, rtol=0, msg=mode)
+        assert got.numel() * got.element_size() * 2 == ref.numel() * ref.element_size()
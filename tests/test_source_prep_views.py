@@ -0,0 +1,97 @@
+"""Source Prep trims: same frames as the concatenating implementation, as views where contiguous."""
+import pytest
+import torch
+
+
+def clip(frames=24, seed=0):
+    return torch.rand(frames, 8, 12, 3, generator=torch.Generator().manual_seed(seed))
+
+
+def shares_storage(t, source):
+    return t.untyped_storage().data_ptr() == source.untyped_storage().data_ptr()
+
+
+@pytest.mark.parametrize("split_index, input_left, input_right, edge_frames", [
+    (10, 3, 4, 5), (0, 0, 0, 6), (20, 8, 8, 8), (10, 0, 2, 0), (23, 2, 0, 4),
+])
+def test_replace_inpaint_is_a_view(nodes, split_index, input_left, input_right, edge_frames):
+    source = clip()
+    B = source.shape[0]
+    output, _, out_split, out_edge, *_ = nodes.VACESourcePrep().prepare(
+        source, "Replace/Inpaint", split_index, input_left, input_right, edge_frames)
+    start, end = split_index, min(split_index + edge_frames, B)
+    ctx_start = max(0, start - input_left) if input_left > 0 else 0
+    ctx_end = min(B, end + input_right) if input_right > 0 else B
+    reference = torch.cat([source[ctx_start:start], source[start:end], source[end:ctx_end]])
+    assert torch.equal(output, reference)
+    assert (out_split, out_edge) == (start - ctx_start, end - start)
+    assert shares_storage(output, source)
+
+
+@pytest.mark.parametrize("frames, edge_frames", [(24, 4), (24, 12), (7, 3), (9, 20)])
+def test_join_extend_one_clip_is_a_view(nodes, frames, edge_frames):
+    source = clip(frames)
+    output, *_ = nodes.VACESourcePrep().prepare(source, "Join Extend", edge_frames=edge_frames)
+    half = frames // 2
+    sym = min(edge_frames, half, frames - half)
+    reference = torch.cat([source[:half][-sym:], source[half:][:sym]])
+    assert torch.equal(output, reference)
+    assert shares_storage(output, source)
+
+
+def test_join_extend_two_clips_matches_reference(nodes):
+    first, second = clip(10), clip(14, seed=1)
+    output, *_ = nodes.VACESourcePrep().prepare(first, "Join Extend", edge_frames=6, source_clip_2=second)
+    assert torch.equal(output, torch.cat([first[-6:], second[:6]]))
+
+
+@pytest.mark.parametrize("frames, edge_frames, contiguous", [(24, 4, False), (8, 4, True), (6, 10, False), (24, 0, True)])
+def test_edge_extend(nodes, frames, edge_frames, contiguous):
+    source = clip(frames)
+    output, *_ = nodes.VACESourcePrep().prepare(source, "Edge Extend", edge_frames=edge_frames)
+    sym = min(edge_frames, frames)
+    reference = torch.cat([source[:sym], source[-sym:]]) if sym else source[:0]
+    assert torch.equal(output, reference)
+    assert shares_storage(output, source) == contiguous
+
+
+def test_upscale_without_references_returns_source(nodes):
+    source = clip()
+    output, *_ = nodes.VACESourcePrep().prepare(source, "Upscale")
+    assert output is source
+
+
+@pytest.mark.parametrize("positions, references", [("0,5,23", 3), ("7", 1), ("3,12", 1), ("23,0", 2)])
+def test_upscale_splice_matches_clone(nodes, positions, references):
+    source, refs = clip(), clip(references, seed=3)
+    before = source.clone()
+    output, *_ = nodes.VACESourcePrep().prepare(source, "Upscale", source_clip_2=refs, keyframe_positions=positions)
+    reference = source.clone()
+    for i, pos in enumerate(int(p) for p in positions.split(",")):
+        reference[pos] = refs[0 if references == 1 else i]
+    assert torch.equal(output, reference)
+    assert torch.equal(source, before)
+
+
+@pytest.mark.parametrize("mode", ["End Extend", "Pre Extend", "Middle Extend", "Edge Extend", "Join Extend",
+                                  "Bidirectional Extend", "Replace/Inpaint", "Keyframe", "Upscale"])
+def test_plan_matches_nodes(nodes, plan_node, mode):
+    """The planner's shapes agree with a real run, and view-returning trims are planned as free."""
+    frames, height, width = 24, 16, 24
+    args = dict(split_index=10, input_left=4, input_right=5, edge_frames=6, target_frames=33)
+    plan = plan_node.vace_plan(frames, height, width, mode, **args)
+    source = torch.rand(frames, height, width, 3)
+    trimmed, _, out_split, out_edge, _, kp_out, pipe = nodes.VACESourcePrep().prepare(
+        source, mode, args["split_index"], args["input_left"], args["input_right"], args["edge_frames"])
+    control, mask, target, _ = nodes.VACEMaskGenerator().generate(trimmed, mode, args["target_frames"], out_split, out_edge,
+                                                                  keyframe_positions=kp_out)
+    prep = plan["source_prep"]
+    assert prep["trimmed_frames"] == trimmed.shape[0]
+    assert (prep["trim_start"], prep["trim_end"]) == (pipe["trim_start"], pipe["trim_end"])
+    assert plan["mask_generator"]["target_frames"] == target
+    assert plan["sampler"]["frames"] == control.shape[0]
+    assert plan["mask_generator"]["kept_frames"] == int((mask[:, 0, 0, 0] == nodes.BLACK).sum())
+    if shares_storage(trimmed, source):
+        assert prep["allocated_bytes"] == 0
+    else:
+        assert prep["allocated_bytes"] == trimmed.numel() * trimmed.element_size()
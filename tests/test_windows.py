@@ -0,0 +1,70 @@
+"""Windowed prep plans and the windowed Merge Back stitcher."""
+import pytest
+import torch
+
+
+def clip(frames, height=8, width=12, seed=0):
+    return torch.rand(frames, height, width, 3, generator=torch.Generator().manual_seed(seed))
+
+
+def coverage(windows, total):
+    counts = [0] * total
+    for start, end in windows:
+        for f in range(start, end):
+            counts[f] += 1
+    return counts
+
+
+@pytest.mark.parametrize("total, window_frames, overlap", [
+    (50, 21, 8), (50, 21, 10), (200, 81, 8), (200, 81, 40), (90, 33, 0), (34, 33, 16), (300, 17, 8),
+])
+def test_plan_covers_every_frame_at_most_twice(nodes, total, window_frames, overlap):
+    windows = nodes._plan_windows(total, window_frames, overlap)
+    window = nodes._snap_4n1(window_frames)
+    assert all(end - start == window for start, end in windows)
+    assert windows[0][0] == 0 and windows[-1][1] == total
+    assert all(1 <= c <= 2 for c in coverage(windows, total))
+    assert all(b[0] <= a[1] for a, b in zip(windows, windows[1:]))
+
+
+def test_overlap_above_half_window_is_rejected(nodes):
+    assert nodes._plan_windows(200, 81, 40)
+    with pytest.raises(ValueError, match="at most half the window"):
+        nodes._plan_windows(200, 81, 41)
+    with pytest.raises(ValueError, match="at most half the window"):
+        nodes.VACESourceWindows().prepare(clip(200), "Upscale", 81, 60)
+
+
+def reference_stitch(source, outputs, windows):
+    """Per-frame stitch: one window copies its output, two windows fade from the earlier one."""
+    result = source.clone()
+    for k, (start, end) in enumerate(windows):
+        prev_end = windows[k - 1][1] if k > 0 else 0
+        n = max(0, prev_end - start)
+        for f in range(start, end):
+            j = f - start
+            if j < n:
+                alpha = (j + 1) / (n + 1)
+                prev_start = windows[k - 1][0]
+                result[f] = outputs[k - 1][f - prev_start] * (1.0 - alpha) + outputs[k][j] * alpha
+            else:
+                result[f] = outputs[k][j]
+    return result
+
+
+@pytest.mark.parametrize("total, window_frames, overlap", [(50, 21, 8), (50, 21, 10), (61, 17, 4), (40, 41, 8)])
+@pytest.mark.parametrize("batched", [False, True])
+def test_windowed_merge_matches_reference(nodes, merge_node, total, window_frames, overlap, batched):
+    source = clip(total)
+    *_, pipes = nodes.VACESourceWindows().prepare(source, "Upscale", window_frames, overlap)
+    windows = [(p["trim_start"], p["trim_end"]) for p in pipes]
+    outputs = [clip(end - start, seed=10 + k) for k, (start, end) in enumerate(windows)]
+    vace_output = [torch.cat(outputs)] if batched else outputs
+    got = merge_node.VACEMergeBackWindows().merge([source], vace_output, pipes, ["alpha"], ["fast"])[0]
+    assert got.shape == source.shape
+    assert torch.allclose(got, reference_stitch(source, outputs, windows), atol=1e-6)
+
+    hard = merge_node.VACEMergeBackWindows().merge([source], vace_output, pipes, ["none"], ["fast"])[0]
+    for k, (start, end) in enumerate(windows):
+        core = windows[k - 1][1] if k > 0 else start
+        assert torch.equal(hard[core:end], outputs[k][core - start:])
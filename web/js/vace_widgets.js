@@ -27,12 +27,17 @@ app.registerExtension({
             widget.type = show ? widget._origType : "hidden";
         }
 
+        const CROP_WIDGETS = ["crop_to_mask", "crop_padding"];
+
         function updateVisibility(mode) {
             const vis = VISIBILITY[mode];
             if (!vis) return;
             for (const [name, show] of Object.entries(vis)) {
                 toggleWidget(node.widgets.find(w => w.name === name), show);
             }
+            for (const name of CROP_WIDGETS) {
+                toggleWidget(node.widgets.find(w => w.name === name), mode === "Video Inpaint");
+            }
             node.setSize(node.computeSize());
             app.graph.setDirtyCanvas(true);
         }
@@ -80,7 +85,7 @@ app.registerExtension({
 app.registerExtension({
     name: "VACE.MergeBack.SmartDisplay",
     nodeCreated(node) {
-        if (node.comfyClass !== "VACEMergeBack") return;
+        if (!["VACEMergeBack", "VACEMergeBackWindows", "VACEMergeBackToDisk"].includes(node.comfyClass)) return;
 
         const methodWidget = node.widgets.find(w => w.name === "blend_method");
         if (!methodWidget) return;
@@ -94,6 +99,9 @@ app.registerExtension({
         function updateVisibility(method) {
             const showOf = method === "optical_flow";
             toggleWidget(node.widgets.find(w => w.name === "of_preset"), showOf);
+            toggleWidget(node.widgets.find(w => w.name === "of_backend"), showOf);
+            toggleWidget(node.widgets.find(w => w.name === "of_tile"), showOf);
+            toggleWidget(node.widgets.find(w => w.name === "of_cache"), showOf);
             node.setSize(node.computeSize());
             app.graph.setDirtyCanvas(true);
         }